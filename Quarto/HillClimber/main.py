@@ -5,7 +5,6 @@ import logging
 import argparse
 import random
 from quarto.objects import *
-from copy import deepcopy
 
 
 class RandomPlayer(Player):
@@ -27,7 +26,9 @@ class HillClimberPlayer(Player):
     def __init__(self, quarto: Quarto) -> None:
         super().__init__(quarto)
         self.__quarto = quarto
-        
+        #pieces never change, their characteristics are read once
+        self.__pieces = [quarto.get_piece_charachteristics(i) for i in range(16)]
+
 
     def choose_piece(self) -> int:
 
@@ -39,23 +40,24 @@ class HillClimberPlayer(Player):
             return piece_index
     
         def evaluateChoose(piece_index):
-            tmp = deepcopy(self.__quarto)
             score = 0
             n = 0
-            if tmp.select(piece_index):
+            if self.__quarto.push_select(piece_index):
                 score = float('-inf')
                 for x in range(4):
                     for y in range(4):
-                        s, high, coloured, solid, square = self.evaluatePlace(x, y, piece_index)
+                        s, high, coloured, solid, square = self.evaluatePlace(x, y)
                         #if with the considered piece index the opponent has the chance to win in this round of the game, the piece index will be assigned the least score
                         if s == 4:
                             score = -1
+                            self.__quarto.pop()
                             return score, n
                         if s > score:
                             score = s
                         if score == 3:
                             #in case of score = 3, n is the number of the same attributes of the considered elements
                             n = high + coloured + solid + square
+                self.__quarto.pop()
 
             return score, n
 
@@ -101,43 +103,136 @@ class HillClimberPlayer(Player):
         return current_piece_index
 
     def evaluatePlace(self, x, y, piece_index = None):
-        tmp = deepcopy(self.__quarto)
-        if piece_index != None:
-            tmp.select(piece_index)
-        if tmp.place(x, y):
-            if tmp.check_finished():
-                return 4, False, False, False, False
-            else:
-                #checking elements on the same row
-                score = 1
+        #the move is played on the game itself and undone once scored
+        selected = piece_index != None and self.__quarto.push_select(piece_index)
+        result = 0, False, False, False, False
+        if self.__quarto.push_place(x, y):
+            result = self.scorePlace(self.__quarto._board, x, y)
+            self.__quarto.pop()
+        if selected:
+            self.__quarto.pop()
+        return result
+
+    def scorePlace(self, board, x, y):
+        if self.__quarto.check_finished():
+            return 4, False, False, False, False
+        else:
+            #checking elements on the same row
+            score = 1
+            score1 = 1
+            score2 = 1
+            score3 = 1
+            score4 = 1
+            n = 1
+            high = False
+            coloured = False
+            solid = False
+            square = False
+            for i in range(1,4):
+                k = (x + i) % 4
+                if board[y, k] != -1:
+                    n += 1
+                    if self.__pieces[board[y, k]].HIGH == self.__pieces[board[y, x]].HIGH:
+                        score1 += 1
+                    if self.__pieces[board[y, k]].COLOURED == self.__pieces[board[y, x]].COLOURED:
+                        score2 += 1
+                    if self.__pieces[board[y, k]].SOLID == self.__pieces[board[y, x]].SOLID:
+                        score3 += 1
+                    if self.__pieces[board[y, k]].SQUARE == self.__pieces[board[y, x]].SQUARE:
+                        score4 += 1
+
+            score = max(score, score1, score2, score3, score4)
+
+            if score < n:
+                score = 0
+
+            if score == 3:
+                if score == score1:
+                    high = True
+                if score == score2:
+                    coloured = True
+                if score == score3:
+                    solid = True
+                if score == score4:
+                    square = True
+            
+            if score == 4:
+                return score, False, False, False, False
+            
+            #checking elements on the same column
+            score1 = 1
+            score2 = 1
+            score3 = 1
+            score4 = 1
+            n = 1
+            for i in range(1,4):
+                k = (y + i) % 4
+                if board[k, x] != -1:
+                    n += 1
+                    if self.__pieces[board[k, x]].HIGH == self.__pieces[board[y, x]].HIGH:
+                        score1 += 1
+                    if self.__pieces[board[k, x]].COLOURED == self.__pieces[board[y, x]].COLOURED:
+                        score2 += 1
+                    if self.__pieces[board[k, x]].SOLID == self.__pieces[board[y, x]].SOLID:
+                        score3 += 1
+                    if self.__pieces[board[k, x]].SQUARE == self.__pieces[board[y, x]].SQUARE:
+                        score4 += 1
+
+            scoreNew = max(score1, score2, score3, score4)
+
+            if scoreNew < n:
+                scoreNew = 0
+            
+            if scoreNew == 3:
+                high = False
+                coloured = False
+                solid = False
+                square = False
+                if score == score1:
+                    high = True
+                if score == score2:
+                    coloured = True
+                if score == score3:
+                    solid = True
+                if score == score4:
+                    square = True
+
+            if scoreNew == 4:
+                return scoreNew, False, False, False, False
+            
+            if scoreNew > score:
+                score = scoreNew
+            
+            #checking elements on the same diagonal in case of the considered place on the main diagonal
+            if x == y:
                 score1 = 1
                 score2 = 1
                 score3 = 1
                 score4 = 1
                 n = 1
-                high = False
-                coloured = False
-                solid = False
-                square = False
-                for i in range(1,4):
+                for i in range(1, 4):
                     k = (x + i) % 4
-                    if tmp._board[y, k] != -1:
+                    if board[k, k] != -1:
                         n += 1
-                        if tmp._Quarto__pieces[tmp._board[y, k]].HIGH == tmp._Quarto__pieces[tmp._board[y, x]].HIGH:
+                        if self.__pieces[board[k, k]].HIGH == self.__pieces[board[y, x]].HIGH:
                             score1 += 1
-                        if tmp._Quarto__pieces[tmp._board[y, k]].COLOURED == tmp._Quarto__pieces[tmp._board[y, x]].COLOURED:
+                        if self.__pieces[board[k, k]].COLOURED == self.__pieces[board[y, x]].COLOURED:
                             score2 += 1
-                        if tmp._Quarto__pieces[tmp._board[y, k]].SOLID == tmp._Quarto__pieces[tmp._board[y, x]].SOLID:
+                        if self.__pieces[board[k, k]].SOLID == self.__pieces[board[y, x]].SOLID:
                             score3 += 1
-                        if tmp._Quarto__pieces[tmp._board[y, k]].SQUARE == tmp._Quarto__pieces[tmp._board[y, x]].SQUARE:
+                        if self.__pieces[board[k, k]].SQUARE == self.__pieces[board[y, x]].SQUARE:
                             score4 += 1
+                
+                scoreNew = max(score1, score2, score3, score4)
 
-                score = max(score, score1, score2, score3, score4)
-
-                if score < n:
-                    score = 0
+                if scoreNew < n:
+                    scoreNew = 0
 
-                if score == 3:
+                if scoreNew == 3:
+                    high = False
+                    coloured = False
+                    solid = False
+                    square = False
                     if score == score1:
                         high = True
                     if score == score2:
@@ -146,34 +241,39 @@ class HillClimberPlayer(Player):
                         solid = True
                     if score == score4:
                         square = True
+            
+                if scoreNew == 4:
+                    return scoreNew, False, False, False, False
                 
-                if score == 4:
-                    return score, False, False, False, False
-                
-                #checking elements on the same column
+                if scoreNew > score:
+                    score = scoreNew
+
+            #checking elements on the same diagonal in case of the considered place on the secondary diagonal
+            if x + y == 3:   
                 score1 = 1
                 score2 = 1
                 score3 = 1
                 score4 = 1
                 n = 1
-                for i in range(1,4):
-                    k = (y + i) % 4
-                    if tmp._board[k, x] != -1:
+                for i in range(1, 4):
+                    r = (y + i) % 4
+                    k = 3 - r
+                    if board[r, k] != -1:
                         n += 1
-                        if tmp._Quarto__pieces[tmp._board[k, x]].HIGH == tmp._Quarto__pieces[tmp._board[y, x]].HIGH:
+                        if self.__pieces[board[r, k]].HIGH == self.__pieces[board[y, x]].HIGH:
                             score1 += 1
-                        if tmp._Quarto__pieces[tmp._board[k, x]].COLOURED == tmp._Quarto__pieces[tmp._board[y, x]].COLOURED:
+                        if self.__pieces[board[r, k]].COLOURED == self.__pieces[board[y, x]].COLOURED:
                             score2 += 1
-                        if tmp._Quarto__pieces[tmp._board[k, x]].SOLID == tmp._Quarto__pieces[tmp._board[y, x]].SOLID:
+                        if self.__pieces[board[r, k]].SOLID == self.__pieces[board[y, x]].SOLID:
                             score3 += 1
-                        if tmp._Quarto__pieces[tmp._board[k, x]].SQUARE == tmp._Quarto__pieces[tmp._board[y, x]].SQUARE:
+                        if self.__pieces[board[r, k]].SQUARE == self.__pieces[board[y, x]].SQUARE:
                             score4 += 1
 
                 scoreNew = max(score1, score2, score3, score4)
 
                 if scoreNew < n:
                     scoreNew = 0
-                
+
                 if scoreNew == 3:
                     high = False
                     coloured = False
@@ -188,103 +288,10 @@ class HillClimberPlayer(Player):
                     if score == score4:
                         square = True
 
-                if scoreNew == 4:
-                    return scoreNew, False, False, False, False
-                
                 if scoreNew > score:
                     score = scoreNew
-                
-                #checking elements on the same diagonal in case of the considered place on the main diagonal
-                if x == y:
-                    score1 = 1
-                    score2 = 1
-                    score3 = 1
-                    score4 = 1
-                    n = 1
-                    for i in range(1, 4):
-                        k = (x + i) % 4
-                        if tmp._board[k, k] != -1:
-                            n += 1
-                            if tmp._Quarto__pieces[tmp._board[k, k]].HIGH == tmp._Quarto__pieces[tmp._board[y, x]].HIGH:
-                                score1 += 1
-                            if tmp._Quarto__pieces[tmp._board[k, k]].COLOURED == tmp._Quarto__pieces[tmp._board[y, x]].COLOURED:
-                                score2 += 1
-                            if tmp._Quarto__pieces[tmp._board[k, k]].SOLID == tmp._Quarto__pieces[tmp._board[y, x]].SOLID:
-                                score3 += 1
-                            if tmp._Quarto__pieces[tmp._board[k, k]].SQUARE == tmp._Quarto__pieces[tmp._board[y, x]].SQUARE:
-                                score4 += 1
-                    
-                    scoreNew = max(score1, score2, score3, score4)
-
-                    if scoreNew < n:
-                        scoreNew = 0
-
-                    if scoreNew == 3:
-                        high = False
-                        coloured = False
-                        solid = False
-                        square = False
-                        if score == score1:
-                            high = True
-                        if score == score2:
-                            coloured = True
-                        if score == score3:
-                            solid = True
-                        if score == score4:
-                            square = True
-                
-                    if scoreNew == 4:
-                        return scoreNew, False, False, False, False
-                    
-                    if scoreNew > score:
-                        score = scoreNew
-
-                #checking elements on the same diagonal in case of the considered place on the secondary diagonal
-                if x + y == 3:   
-                    score1 = 1
-                    score2 = 1
-                    score3 = 1
-                    score4 = 1
-                    n = 1
-                    for i in range(1, 4):
-                        r = (y + i) % 4
-                        k = 3 - r
-                        if tmp._board[r, k] != -1:
-                            n += 1
-                            if tmp._Quarto__pieces[tmp._board[r, k]].HIGH == tmp._Quarto__pieces[tmp._board[y, x]].HIGH:
-                                score1 += 1
-                            if tmp._Quarto__pieces[tmp._board[r, k]].COLOURED == tmp._Quarto__pieces[tmp._board[y, x]].COLOURED:
-                                score2 += 1
-                            if tmp._Quarto__pieces[tmp._board[r, k]].SOLID == tmp._Quarto__pieces[tmp._board[y, x]].SOLID:
-                                score3 += 1
-                            if tmp._Quarto__pieces[tmp._board[r, k]].SQUARE == tmp._Quarto__pieces[tmp._board[y, x]].SQUARE:
-                                score4 += 1
-
-                    scoreNew = max(score1, score2, score3, score4)
-
-                    if scoreNew < n:
-                        scoreNew = 0
-
-                    if scoreNew == 3:
-                        high = False
-                        coloured = False
-                        solid = False
-                        square = False
-                        if score == score1:
-                            high = True
-                        if score == score2:
-                            coloured = True
-                        if score == score3:
-                            solid = True
-                        if score == score4:
-                            square = True
-
-                    if scoreNew > score:
-                        score = scoreNew
-                            
-                return score, high, coloured, solid, square
-
-        return 0, False, False, False, False
+                        
+            return score, high, coloured, solid, square
 
     def place_piece(self) -> tuple[int, int]:
 
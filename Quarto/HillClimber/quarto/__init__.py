@@ -1,4 +1,6 @@
 # Free for personal or classroom use; see 'LICENSE.md' for details.
 # https://github.com/squillero/computational-intelligence
 
-from .objects import *
\ No newline at end of file
+from .objects import *
+from .bitboard import QuartoState
+from .negamax import Negamax
@@ -0,0 +1,104 @@
+from typing import NamedTuple
+from .objects import Quarto
+
+
+#cell (x, y) is bit y * 4 + x of every 16 bit mask
+FULL = 0xFFFF
+
+#rows, columns and the two diagonals
+LINES = tuple([0xF << (4 * y) for y in range(4)] + [0x1111 << x for x in range(4)] + [0x8421, 0x1248])
+
+#the lines each cell is on, 2 to 4 of them
+LINES_THROUGH = tuple(tuple(line for line in LINES if line >> cell & 1) for cell in range(16))
+
+#bit a of a piece index is one of its attributes (square, solid, coloured, high); the board has a 16 bit
+#plane per attribute, so a piece placed on cell c sets bit 16 * a + c for each attribute a it has
+PLANES = tuple(sum(1 << (16 * a) for a in range(4) if piece >> a & 1) for piece in range(16))
+
+
+class QuartoState(NamedTuple):
+    """An immutable Quarto position: the attribute planes of the board in one int, and three small masks.
+
+    `occupied` has a bit per cell holding a piece, `used` a bit per piece
+    already on the board, and `selected` is the piece to place next (-1 if
+    none). select and place return a new state, so undoing a move is just
+    going back to the previous one.
+    """
+
+    board: int = 0
+    occupied: int = 0
+    used: int = 0
+    selected: int = -1
+
+    def piece_at(self, x: int, y: int) -> int:
+        """Index of the piece on (x, y), -1 if the cell is empty"""
+        cell = y * 4 + x
+        if not self.occupied >> cell & 1:
+            return -1
+        return sum((self.board >> (16 * a + cell) & 1) << a for a in range(4))
+
+    def free_pieces(self):
+        return [piece for piece in range(16) if not self.used >> piece & 1]
+
+    def free_cells(self):
+        return [(cell % 4, cell // 4) for cell in range(16) if not self.occupied >> cell & 1]
+
+    def select(self, piece: int) -> "QuartoState":
+        """The state with `piece` selected, None if it is already on the board"""
+        if not 0 <= piece < 16 or self.used >> piece & 1:
+            return None
+        return self._replace(selected=piece)
+
+    def place(self, x: int, y: int) -> "QuartoState":
+        """The state with the selected piece on (x, y), None if the cell is taken or no piece is selected"""
+        if not (0 <= x < 4 and 0 <= y < 4) or self.selected < 0:
+            return None
+        cell = y * 4 + x
+        if self.occupied >> cell & 1:
+            return None
+        return QuartoState(self.board | PLANES[self.selected] << cell, self.occupied | 1 << cell,
+                           self.used | 1 << self.selected, -1)
+
+    def unplace(self, x: int, y: int) -> "QuartoState":
+        """The state before the piece on (x, y) was placed, with that piece selected again"""
+        piece = self.piece_at(x, y)
+        cell = y * 4 + x
+        return QuartoState(self.board & ~(PLANES[piece] << cell), self.occupied & ~(1 << cell),
+                           self.used & ~(1 << piece), piece)
+
+    def is_win(self, x: int = None, y: int = None) -> bool:
+        """Whether a full line shares an attribute: only the lines through (x, y) if given, the last placement"""
+        lines = LINES if x is None else LINES_THROUGH[y * 4 + x]
+        for line in lines:
+            if self.occupied & line != line:
+                continue
+            for a in range(4):
+                common = self.board >> (16 * a) & line
+                if common == line or common == 0:
+                    return True
+        return False
+
+    def is_full(self) -> bool:
+        return self.occupied == FULL
+
+    @classmethod
+    def from_quarto(cls, quarto: Quarto) -> "QuartoState":
+        state = cls()
+        board = quarto.get_board_status()
+        for y in range(4):
+            for x in range(4):
+                if board[y, x] >= 0:
+                    state = state._replace(selected=int(board[y, x])).place(x, y)
+        #Quarto keeps the last placed piece as its selected one until the next select
+        selected = quarto.get_selected_piece()
+        return state.select(selected) or state
+
+    def to_quarto(self) -> Quarto:
+        """A new Quarto game in this position, player 0 to move"""
+        quarto = Quarto()
+        for x, y in ((cell % 4, cell // 4) for cell in range(16) if self.occupied >> cell & 1):
+            quarto.select(self.piece_at(x, y))
+            quarto.place(x, y)
+        if self.selected >= 0:
+            quarto.select(self.selected)
+        return quarto
@@ -0,0 +1,330 @@
+import itertools
+import random
+import time
+from typing import NamedTuple
+from .bitboard import FULL, LINES, PLANES, QuartoState
+
+
+#values for the player placing the selected piece; DRAW is also the value of positions past the search depth
+WIN, DRAW, LOSS = 1, 0, -1
+
+#depth of entries whose value holds at any depth: searched to the end, or a win or loss already proven
+SOLVED = 16
+
+#what a stored value is: the exact one, or only a lower or an upper bound of it
+EXACT, LOWER, UPPER = 0, 1, 2
+
+#positions with this many empty cells or fewer are not stored
+TABLE_EMPTY = 3
+
+#pieces, as a 16 bit mask over piece indices, that have attribute a (WITH[a]) or lack it (WITHOUT[a])
+WITH = tuple(sum(1 << piece for piece in range(16) if piece >> a & 1) for a in range(4))
+WITHOUT = tuple(FULL & ~mask for mask in WITH)
+
+
+def _symmetries() -> list:
+    """The 32 permutations of the cells that map lines to lines: permuted rows and columns, maybe transposed"""
+    symmetries = set()
+    for rows, columns in itertools.product(itertools.permutations(range(4)), repeat=2):
+        for transposed in (False, True):
+            cells = []
+            for cell in range(16):
+                y, x = rows[cell // 4], columns[cell % 4]
+                cells.append(x * 4 + y if transposed else y * 4 + x)
+            if sorted(sum(1 << cells[c] for c in range(16) if line >> c & 1) for line in LINES) == sorted(LINES):
+                symmetries.add(tuple(cells))
+    return sorted(symmetries)
+
+#each symmetry applied to a 16 bit mask a byte at a time: table[0][low byte] | table[1][high byte]
+SYMMETRIES = tuple(tuple(tuple(sum(1 << cells[8 * half + c] for c in range(8) if byte >> c & 1) for byte in range(256))
+                         for half in range(2)) for cells in _symmetries())
+
+
+def threats(board: int, occupied: int) -> int:
+    """Pieces, as a 16 bit mask, that complete a line if placed on its only empty cell"""
+    pieces = 0
+    planes = None
+    for line in LINES:
+        empty = line & ~occupied
+        if empty and not empty & (empty - 1):
+            if planes is None:
+                planes = ((board & FULL, WITH[0], WITHOUT[0]), (board >> 16 & FULL, WITH[1], WITHOUT[1]),
+                          (board >> 32 & FULL, WITH[2], WITHOUT[2]), (board >> 48, WITH[3], WITHOUT[3]))
+            #the three pieces all have the attribute, or none has it
+            full = line ^ empty
+            for plane, with_, without in planes:
+                common = plane & line
+                if common == full:
+                    pieces |= with_
+                elif not common:
+                    pieces |= without
+    return pieces
+
+def winning_cell(board: int, occupied: int, piece: int) -> int:
+    """A cell where `piece` completes a line, -1 if there is none"""
+    for line in LINES:
+        empty = line & ~occupied
+        if empty and not empty & (empty - 1):
+            for a in range(4):
+                count = (board >> (16 * a) & line).bit_count()
+                if count == 3 and piece >> a & 1 or count == 0 and not piece >> a & 1:
+                    return empty.bit_length() - 1
+    return -1
+
+def canonical(board: int, occupied: int, piece: int) -> int:
+    """The same int for every position equivalent to this one, `piece` being the one to place.
+
+    Complementing an attribute everywhere is a symmetry, so attributes of
+    the piece to place are complemented until it is piece 0; permuting
+    attributes only permutes the planes of the board, which are sorted.
+    The key is the smallest of the 32 geometric symmetries of the result,
+    the occupied cells being compared first so that only the symmetries
+    giving the smallest of them need the planes.
+    """
+    cells = [low[occupied & 255] | high[occupied >> 8] for low, high in SYMMETRIES]
+    smallest = min(cells)
+    planes = [(board >> (16 * a) & FULL) ^ (occupied if piece >> a & 1 else 0) for a in range(4)]
+    best = None
+    for (low, high), transformed in zip(SYMMETRIES, cells):
+        if transformed == smallest:
+            p = sorted([low[m & 255] | high[m >> 8] for m in planes])
+            key = p[0] << 48 | p[1] << 32 | p[2] << 16 | p[3]
+            if best is None or key < best:
+                best = key
+    return smallest << 64 | best
+
+def _cells(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class TranspositionTable:
+    """A fixed number of slots, a canonical key going to the slot of its Zobrist hash.
+
+    A slot keeps the entry searched deepest unless it was stored by an
+    earlier search, which any new entry replaces; new_search starts one
+    without forgetting anything.
+    """
+
+    def __init__(self, bits: int = 20, seed: int = 42):
+        rng = random.Random(seed)
+        #one random 64 bit number per byte value per byte of a key
+        self.zobrist = [[rng.getrandbits(64) for _ in range(256)] for _ in range(10)]
+        self.mask = (1 << bits) - 1
+        self.keys = [None] * (1 << bits)
+        self.entries = [None] * (1 << bits)
+        self.generation = 0
+
+    def index(self, key: int) -> int:
+        h = 0
+        for table in self.zobrist:
+            h ^= table[key & 255]
+            key >>= 8
+        return h & self.mask
+
+    def new_search(self):
+        self.generation += 1
+
+    def get(self, key: int):
+        """The (value, flag, depth) stored for `key`, None if there is none"""
+        i = self.index(key)
+        if self.keys[i] == key:
+            return self.entries[i][:3]
+        return None
+
+    def put(self, key: int, value: int, flag: int, depth: int):
+        i = self.index(key)
+        entry = self.entries[i]
+        if entry is None or self.keys[i] == key or entry[3] != self.generation or depth >= entry[2]:
+            self.keys[i] = key
+            self.entries[i] = (value, flag, depth, self.generation)
+
+
+class Result(NamedTuple):
+    """Outcome of a search: the value for the player to move (None if no search finished), the (x, y) to
+    place the selected piece on (None when only choosing), the piece to give (-1 if none), and whether
+    the value is the game's, rather than what is known within the depth searched"""
+
+    value: int
+    cell: tuple
+    piece: int
+    exact: bool
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Negamax:
+    """Negamax with alpha-beta over Quarto moves, a move being where to place the selected piece and which
+    piece to give the opponent, deepened one move at a time until `time_limit` seconds have passed.
+
+    Pieces that let the opponent win at once are never given unless all do.
+    Positions past the depth are worth DRAW, so a shallow search only
+    finds forced wins and losses; deepening stops once the game is solved.
+    Each iteration tries first the moves of the previous principal
+    variation, then the two killer moves of the ply, then the others by
+    history score. Positions are stored under their canonical key, and the
+    table and history are kept from one move to the next.
+    """
+
+    def __init__(self, time_limit: float = 1.0, table_bits: int = 20):
+        self.time_limit = time_limit
+        self.table = TranspositionTable(table_bits)
+        #cutoffs caused by each move, a move being cell << 4 | piece given
+        self.history = [0] * 256
+        self.killers = [[-1, -1] for _ in range(17)]
+        #best line found below each ply during the current iteration, and that of the previous one
+        self.lines = [[] for _ in range(18)]
+        self.variation = []
+        self.nodes = 0
+        self.start = None
+
+    def _search(self, board: int, occupied: int, used: int, piece: int, depth: int, ply: int, alpha: int,
+                beta: int) -> int:
+        """Value of placing `piece` for the player to move, with `used` the pieces already on the board,
+        looking `depth` moves ahead.
+
+        Only safe pieces are given, so `piece` cannot complete a line now.
+        """
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self.start + self.time_limit:
+            raise _Timeout
+        self.lines[ply] = []
+        free = FULL & ~occupied
+        empty = free.bit_count()
+        if empty == 1:
+            #the last cell, and placing the piece there does not win
+            return DRAW
+        if depth == 0:
+            return DRAW
+        if depth == 1:
+            #every move leads past the depth, what matters is whether there is one
+            used |= 1 << piece
+            for cell in _cells(free):
+                if FULL & ~used & ~threats(board | PLANES[piece] << cell, occupied | 1 << cell):
+                    return DRAW
+            return LOSS
+        #below a few empty cells searching again is cheaper than canonicalizing
+        key = canonical(board, occupied, piece) if empty > TABLE_EMPTY else None
+        entry = self.table.get(key) if key is not None else None
+        if entry is not None and entry[2] >= min(depth, empty):
+            value, flag, _ = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+        original_alpha = alpha
+        used |= 1 << piece
+        moves = [cell << 4 | other for cell in _cells(free)
+                 for other in _cells(FULL & ~used & ~threats(board | PLANES[piece] << cell, occupied | 1 << cell))]
+        self._order(moves, ply)
+        best = LOSS
+        for move in moves:
+            cell = move >> 4
+            value = -self._search(board | PLANES[piece] << cell, occupied | 1 << cell, used, move & 15, depth - 1,
+                                  ply + 1, -beta, -alpha)
+            if value > best:
+                best = value
+                self.lines[ply] = [move] + self.lines[ply + 1]
+                alpha = max(alpha, best)
+            if alpha >= beta:
+                killers = self.killers[ply]
+                if move != killers[0]:
+                    killers[0], killers[1] = move, killers[0]
+                self.history[move] += depth * depth
+                break
+        flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+        if key is not None:
+            solved = depth >= empty or best == WIN and flag != UPPER or best == LOSS and flag != LOWER
+            self.table.put(key, best, flag, SOLVED if solved else depth)
+        return best
+
+    def _order(self, moves: list, ply: int):
+        """Sorts the moves at `ply`: principal variation, killers, then history"""
+        moves.sort(key=self.history.__getitem__, reverse=True)
+        pv = self.variation[ply] if ply < len(self.variation) else -1
+        for move in (self.killers[ply][1], self.killers[ply][0], pv):
+            if move >= 0 and move in moves:
+                moves.remove(move)
+                moves.insert(0, move)
+
+    def _deepen(self, children: list, empty: int) -> Result:
+        """Iterative deepening over the moves at the root.
+
+        `children` are the positions they lead to as (cell, piece given,
+        board, occupied, used), where `empty` cells are left. An iteration
+        is only used if it finishes, and none starts after half the time.
+        """
+        cell = children[0][0]
+        best = Result(None, None if cell < 0 else (cell % 4, cell // 4), children[0][1], False)
+        for depth in range(1, empty + 1):
+            alpha = LOSS - 1
+            found = None
+            try:
+                for child in children:
+                    cell, other, board, occupied, used = child
+                    value = -self._search(board, occupied, used, other, depth, 1, LOSS, -alpha)
+                    if value > alpha:
+                        alpha = value
+                        found = child
+                        self.variation = [-1, *self.lines[1]]
+                    if value == WIN:
+                        break
+            except _Timeout:
+                break
+            cell, other = found[:2]
+            best = Result(alpha, None if cell < 0 else (cell % 4, cell // 4), other, alpha != DRAW or depth >= empty)
+            #the best move is tried first by the next iteration
+            children.remove(found)
+            children.insert(0, found)
+            if best.exact or time.perf_counter() > self.start + self.time_limit / 2:
+                break
+        return best
+
+    def place(self, state: QuartoState) -> Result:
+        """Best (cell, piece to give) for the player who has to place the selected piece of `state`"""
+        self._start()
+        board, occupied, used, piece = state
+        cell = winning_cell(board, occupied, piece)
+        if cell >= 0:
+            return Result(WIN, (cell % 4, cell // 4), -1, True)
+        used |= 1 << piece
+        free = FULL & ~occupied
+        others = FULL & ~used
+        cell = next(_cells(free))
+        if not others:
+            return Result(DRAW, (cell % 4, cell // 4), -1, True)
+        children = [(cell, other, board | PLANES[piece] << cell, occupied | 1 << cell, used) for cell in _cells(free)
+                    for other in _cells(others & ~threats(board | PLANES[piece] << cell, occupied | 1 << cell))]
+        if not children:
+            #wherever the piece goes, every piece left lets the opponent win
+            return Result(LOSS, (cell % 4, cell // 4), next(_cells(others)), True)
+        children.sort(key=lambda child: self.history[child[0] << 4 | child[1]], reverse=True)
+        return self._deepen(children, free.bit_count() - 1)
+
+    def choose(self, state: QuartoState) -> Result:
+        """Best piece to give when there is nothing to place, as at the start of a game"""
+        self._start()
+        board, occupied, used, _ = state
+        others = FULL & ~used
+        safe = others & ~threats(board, occupied)
+        if not safe:
+            return Result(LOSS, None, next(_cells(others)), True)
+        children = [(-1, other, board, occupied, used) for other in _cells(safe)]
+        return self._deepen(children, (FULL & ~occupied).bit_count())
+
+    def _start(self):
+        self.table.new_search()
+        self.nodes = 0
+        self.start = time.perf_counter()
+        self.variation = []
+        self.killers = [[-1, -1] for _ in range(17)]
+        #older cutoffs count less
+        self.history = [h // 2 for h in self.history]
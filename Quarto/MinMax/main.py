@@ -5,7 +5,8 @@ import logging
 import argparse
 import random
 from quarto.objects import *
-from copy import deepcopy
+from quarto.bitboard import QuartoState
+from quarto.negamax import Negamax
 
 
 class RandomPlayer(Player):
@@ -22,113 +23,26 @@ class RandomPlayer(Player):
 
 
 class MinMaxPlayer(Player):
-    """Evolved player"""
+    """Negamax player, deepening its search until time_limit seconds have passed"""
 
-    def __init__(self, quarto: Quarto) -> None:
+    def __init__(self, quarto: Quarto, time_limit: float = 1.0) -> None:
         super().__init__(quarto)
         self.__quarto = quarto
-
-    def minmaxChoose(self, quarto: Quarto, depth, isMaximizing, alpha, beta):
-        if isMaximizing:
-            bestVal = float('-inf')
-            bestP = -1
-            if depth > 4:
-                return bestP, bestVal
-            steps = 0
-            for p in range(16):
-                tmp = deepcopy(quarto)
-                if tmp.select(p):
-                    steps += 1
-                    x, y, val = self.minmaxPlace(tmp, depth+1, False, alpha, beta)
-                    if val > bestVal:
-                        bestVal = val
-                        bestP = p
-                    alpha = max(alpha, bestVal)
-                    if beta <= alpha or steps > 3:
-                        return bestP, bestVal
-                      
-            return bestP, bestVal
-        
-        else :
-            bestVal = float('inf')
-            bestP = -1
-            if depth > 4:
-                return bestP, bestVal
-            steps = 0
-            for p in range(16):
-                tmp = deepcopy(quarto)
-                if tmp.select(p):
-                    steps += 1
-                    x, y, val = self.minmaxPlace(tmp, depth+1, True, alpha, beta)
-                    if val < bestVal:
-                        bestVal = val
-                        bestP = p
-                    beta = min(beta, bestVal)
-                    if beta <= alpha or steps > 3:
-                        return bestP, bestVal
-                    
-            return bestP, bestVal
+        self.__negamax = Negamax(time_limit)
+        #the piece to give, found by the search along with the last placement
+        self.__piece = -1
 
     def choose_piece(self) -> int:
-        p, _ = self.minmaxChoose(self.__quarto, 0, True, float('-inf'), float('inf'))
-        return p
-
-    def minmaxPlace(self, quarto: Quarto, depth, isMaximizing, alpha, beta):
-        if isMaximizing:
-            bestVal = float('-inf')
-            bestX = -1
-            bestY = -1
-            if depth > 4:
-                return bestX, bestY, bestVal
-            steps = 0
-            for x in range(4):
-                for y in range(4):
-                    tmp = deepcopy(quarto)
-                    if tmp.place(x, y):
-                        steps += 1
-                        if tmp.check_finished():
-                            return x, y, 1
-                        p, val = self.minmaxChoose(tmp, depth+1, False, alpha, beta)
-                        if val > bestVal:
-                            bestVal = val
-                            bestX = x
-                            bestY = y
-                        alpha = max(alpha, bestVal)
-                        if beta <= alpha or steps > 3:
-                            return bestX, bestY, bestVal
-                
-                return bestX, bestY, bestVal
-        
-        else :
-            bestVal = float('inf')
-            bestX = -1
-            bestY = -1
-            if depth > 4:
-                return bestX, bestY, bestVal
-            steps = 0
-            for x in range(4):
-                for y in range(4):
-                    tmp = deepcopy(quarto)
-                    if tmp.place(x, y):
-                        steps += 1
-                        if tmp.check_finished():
-                            return x, y, 1
-                        p, val = self.minmaxChoose(tmp, depth+1, True, alpha, beta)
-                        if val < bestVal:
-                            bestVal = val
-                            bestX = x
-                            bestY = y
-                        beta = min(beta, bestVal)
-                        if beta <= alpha or steps > 3:
-                            return bestX, bestY, bestVal
-                
-                return bestX, bestY, bestVal
-                
-        
+        state = QuartoState.from_quarto(self.__quarto)
+        piece, self.__piece = self.__piece, -1
+        if piece >= 0 and not state.used >> piece & 1:
+            return piece
+        return self.__negamax.choose(state).piece
 
     def place_piece(self) -> tuple[int, int]:
-        x, y, _ = self.minmaxPlace(self.__quarto, 0, True, float('-inf'), float('inf'))
-        return x, y
+        result = self.__negamax.place(QuartoState.from_quarto(self.__quarto))
+        self.__piece = result.piece
+        return result.cell
 
 
 def main():
@@ -33,10 +33,27 @@ class Piece(object):
         self.binary = [int(high), int(coloured), int(solid), int(square)]
 
 
+def _lines(side: int) -> tuple:
+    '''
+    Rows, columns and the two diagonals of the board, as (y, x) cells
+    '''
+    return tuple([tuple((y, x) for x in range(side)) for y in range(side)] +
+                 [tuple((y, x) for y in range(side)) for x in range(side)] +
+                 [tuple((i, i) for i in range(side)), tuple((i, side - 1 - i) for i in range(side))])
+
+
+def _lines_through(lines: tuple, side: int) -> tuple:
+    return tuple(tuple(tuple(i for i, line in enumerate(lines) if (y, x) in line) for x in range(side))
+                 for y in range(side))
+
+
 class Quarto(object):
 
     MAX_PLAYERS = 2
     BOARD_SIDE = 4
+    LINES = _lines(BOARD_SIDE)
+    # indices of the lines through each cell, LINES_THROUGH[y][x]
+    LINES_THROUGH = _lines_through(LINES, BOARD_SIDE)
 
     def __init__(self) -> None:
         self.__players = ()
@@ -45,8 +62,11 @@ class Quarto(object):
     def reset(self):
         self._board = np.ones(
             shape=(self.BOARD_SIDE, self.BOARD_SIDE), dtype=int) * -1
-        self.__binary_board = np.full(
-            shape=(self.BOARD_SIDE, self.BOARD_SIDE, 4), fill_value=np.nan)
+        # per line: pieces on it, and the AND and OR of their indices (the bits of an index are its attributes)
+        self.__line_count = [0] * len(self.LINES)
+        self.__line_and = [0b1111] * len(self.LINES)
+        self.__line_or = [0] * len(self.LINES)
+        self.__winning_lines = 0
         self.__pieces = []
         self.__pieces.append(Piece(False, False, False, False))  # 0
         self.__pieces.append(Piece(False, False, False, True))  # 1
@@ -66,6 +86,8 @@ class Quarto(object):
         self.__pieces.append(Piece(True, True, True, True))  # 15
         self._current_player = 0
         self.__selected_piece_index = -1
+        # what pop needs to undo each push_select and push_place
+        self.__moves = []
 
     def set_players(self, players: tuple[Player, Player]):
         self.__players = players
@@ -90,15 +112,81 @@ class Quarto(object):
         Place piece in coordinates (x, y). Returns true on success
         '''
         if self.__placeable(x, y):
-            self._board[y, x] = self.__selected_piece_index
-            self.__binary_board[y,
-                                x][:] = self.__pieces[self.__selected_piece_index].binary
+            piece = self.__selected_piece_index
+            self._board[y, x] = piece
+            for line in self.LINES_THROUGH[y][x]:
+                self.__line_count[line] += 1
+                self.__line_and[line] &= piece
+                self.__line_or[line] |= piece
+                # a full line wins if all its pieces have an attribute, or all lack one
+                if self.__line_count[line] == self.BOARD_SIDE and \
+                        (self.__line_and[line] or self.__line_or[line] != 0b1111):
+                    self.__winning_lines += 1
             return True
         return False
 
     def __placeable(self, x: int, y: int) -> bool:
         return not (y < 0 or x < 0 or x > 3 or y > 3 or self._board[y, x] >= 0)
 
+    def push_select(self, pieceIndex: int) -> bool:
+        '''
+        select a piece, so that pop can undo it. Returns True on success
+        '''
+        previous = self.__selected_piece_index
+        if self.select(pieceIndex):
+            self.__moves.append(("select", previous))
+            return True
+        return False
+
+    def push_place(self, x: int, y: int) -> bool:
+        '''
+        Place piece in coordinates (x, y), so that pop can undo it. Returns true on success
+        '''
+        winning_lines = self.__winning_lines
+        if self.place(x, y):
+            self.__moves.append(("place", x, y, winning_lines))
+            return True
+        return False
+
+    def pop(self) -> None:
+        '''
+        Undo the last push_select or push_place (moves made with select and place are not recorded)
+        '''
+        move = self.__moves.pop()
+        if move[0] == "select":
+            self.__selected_piece_index = move[1]
+            return
+        _, x, y, self.__winning_lines = move
+        self._board[y, x] = -1
+        for line in self.LINES_THROUGH[y][x]:
+            # AND and OR cannot be undone, the 3 remaining cells are read again
+            self.__line_count[line] -= 1
+            self.__line_and[line], self.__line_or[line] = 0b1111, 0
+            for cell in self.LINES[line]:
+                piece = int(self._board[cell])
+                if piece >= 0:
+                    self.__line_and[line] &= piece
+                    self.__line_or[line] |= piece
+
+    def clone(self) -> 'Quarto':
+        '''
+        A copy of the game that can be played independently (pieces, which never change, are shared)
+        '''
+        other = copy.copy(self)
+        other._board = self._board.copy()
+        other.__line_count = self.__line_count.copy()
+        other.__line_and = self.__line_and.copy()
+        other.__line_or = self.__line_or.copy()
+        other.__moves = self.__moves.copy()
+        return other
+
+    def snapshot(self):
+        '''
+        The position as an immutable, hashable QuartoState
+        '''
+        from .bitboard import QuartoState
+        return QuartoState.from_quarto(self)
+
     def print(self):
         '''
         Print the board
@@ -129,40 +217,12 @@ class Quarto(object):
         '''
         return copy.deepcopy(self.__selected_piece_index)
 
-    def __check_horizontal(self) -> int:
-        hsum = np.sum(self.__binary_board, axis=1)
-
-        if self.BOARD_SIDE in hsum or 0 in hsum:
-            return self._current_player
-        else:
-            return -1
-
-    def __check_vertical(self):
-        vsum = np.sum(self.__binary_board, axis=0)
-
-        if self.BOARD_SIDE in vsum or 0 in vsum:
-            return self._current_player
-        else:
-            return -1
-
-    def __check_diagonal(self):
-        dsum1 = np.trace(self.__binary_board, axis1=0, axis2=1)
-        dsum2 = np.trace(np.fliplr(self.__binary_board), axis1=0, axis2=1)
-
-        if self.BOARD_SIDE in dsum1 or self.BOARD_SIDE in dsum2 or 0 in dsum1 or 0 in dsum2:
-            return self._current_player
-        else:
-            return -1
-
     def check_winner(self) -> int:
         '''
         Check who is the winner
         '''
-        l = [self.__check_horizontal(), self.__check_vertical(),
-             self.__check_diagonal()]
-        for elem in l:
-            if elem >= 0:
-                return elem
+        if self.__winning_lines:
+            return self._current_player
         return -1
 
     def check_finished(self) -> bool:
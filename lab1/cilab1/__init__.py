@@ -1,116 +1,570 @@
-import random
+import math
+import time
+from collections import namedtuple
 from typing import Callable
 import numpy as np
-import heapq
+from .bounds import dual_bound, greedy_cover, lower_bound, lp_bound
+from .heuristics import HEURISTICS, Heuristic, make_heuristic, register_heuristic
+from .generator import iter_problem, problem
+from .incidence import Incidence
+from .preprocess import Reduction, reduce_problem
 
 
 class State:
-    def __init__(self, data: np.ndarray):
-        self._data = data.copy()
-        self._data.flags.writeable = False
+    """A set of covered elements packed into an integer bitmask"""
+
+    __slots__ = ("_mask",)
+
+    def __init__(self, mask: int = 0):
+        self._mask = mask
+
+    @classmethod
+    def from_elements(cls, elements):
+        return cls(to_bitmask(elements))
 
     def __hash__(self):
-        return hash(bytes(self._data))
+        return hash(self._mask)
 
     def __eq__(self, other):
-        return bytes(self._data) == bytes(other._data)
+        return self._mask == other._mask
 
     def __lt__(self, other):
-        return bytes(self._data) < bytes(other._data)
+        return self._mask < other._mask
+
+    def __or__(self, other):
+        return State(self._mask | other._mask)
+
+    def __len__(self):
+        return self._mask.bit_count()
+
+    def __contains__(self, element):
+        return bool(self._mask >> element & 1)
+
+    def __iter__(self):
+        mask = self._mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
 
     def __str__(self):
-        return str(self._data)
+        return str(set(self))
 
     def __repr__(self):
-        return repr(self._data)
+        return f"State({self._mask:#x})"
 
     @property
-    def data(self):
-        return self._data
+    def data(self) -> int:
+        return self._mask
 
-    def copy_data(self):
-        return self._data.copy()
+    def union(self, mask: int):
+        return State(self._mask | mask)
+
+    def issubset(self, other) -> bool:
+        return self._mask & ~other._mask == 0
+
+def to_bitmask(elements) -> int:
+    mask = 0
+    for e in elements:
+        mask |= 1 << e
+    return mask
+
+def bitmasks(lists) -> list:
+    """One precomputed bitmask per list of the problem"""
+    return [to_bitmask(l) for l in lists]
 
 class PriorityQueue:
-    """A basic Priority Queue with simple performance optimizations"""
+    """A binary heap that tracks the position of every item, so priorities can be lowered in place"""
 
     def __init__(self):
         self._data_heap = list()
-        self._data_set = set()
+        self._position = dict()
+        self._counter = 0
 
     def __bool__(self):
-        return bool(self._data_set)
+        return bool(self._data_heap)
+
+    def __len__(self):
+        return len(self._data_heap)
 
     def __contains__(self, item):
-        return item in self._data_set
+        return item in self._position
 
     def push(self, item, p=None):
         assert item not in self, f"Duplicated element"
         if p is None:
-            p = len(self._data_set)
-        self._data_set.add(item)
-        heapq.heappush(self._data_heap, (p, item))
+            p = len(self._data_heap)
+        #the counter breaks ties in insertion order, so items are never compared
+        self._counter += 1
+        self._data_heap.append((p, self._counter, item))
+        self._position[item] = len(self._data_heap) - 1
+        self._sift_up(len(self._data_heap) - 1)
 
     def pop(self):
-        p, item = heapq.heappop(self._data_heap)
-        self._data_set.remove(item)
+        _, _, item = self._data_heap[0]
+        self._remove_at(0)
         return item
 
+    def peek(self):
+        return self._data_heap[0][2]
+
+    def priority(self, item):
+        return self._data_heap[self._position[item]][0]
+
+    def decrease_key(self, item, p) -> bool:
+        """Lowers the priority of `item` to `p`. Returns False if `p` is not lower"""
+        i = self._position[item]
+        old, counter, _ = self._data_heap[i]
+        if not p < old:
+            return False
+        self._data_heap[i] = (p, counter, item)
+        self._sift_up(i)
+        return True
+
+    def remove(self, item):
+        self._remove_at(self._position[item])
+
+    def _remove_at(self, i):
+        heap = self._data_heap
+        del self._position[heap[i][2]]
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            self._position[last[2]] = i
+            self._sift_down(i)
+            self._sift_up(i)
+
+    def _sift_up(self, i):
+        heap = self._data_heap
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not entry < heap[parent]:
+                break
+            heap[i] = heap[parent]
+            self._position[heap[i][2]] = i
+            i = parent
+        heap[i] = entry
+        self._position[entry[2]] = i
+
+    def _sift_down(self, i):
+        heap = self._data_heap
+        size = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[i] = heap[child]
+            self._position[heap[i][2]] = i
+            i = child
+        heap[i] = entry
+        self._position[entry[2]] = i
+
 def goal_test(N, state):
-    return state == set(range(N))
+    return state.data == (1 << N) - 1
+
+def search(N, lists, parent_state: dict, state_cost: dict, priority_function: Callable = None, heuristic=None,
+           strategy: str = "astar", max_nodes: int = None, max_bytes: int = None, preprocess: bool = True,
+           stats: dict = None):
+    """Best-first search over the sets of covered elements.
+
+    The frontier is ordered by `priority_function(state)` or, when a
+    `heuristic` (a name in HEURISTICS or a Heuristic) is given, by
+    cost + heuristic as in A*, so the returned number of elements is optimal.
+
+    With `strategy` "ida" (iterative-deepening A*) or "sma" (simplified
+    memory-bounded A*, keeping at most `max_nodes` nodes or about `max_bytes`
+    bytes of them) memory stays bounded, and only the solution path is
+    stored in `parent_state` and `state_cost`.
 
-def search(N, lists, parent_state: dict, state_cost: dict, priority_function: Callable):
+    Unless `preprocess` is False, duplicate and dominated lists are dropped
+    and forced lists are picked before searching (see reduce_problem), and
+    what was pruned is written into `stats`, with the largest size the A*
+    frontier reached under "frontier".
+    """
+    if strategy == "astar" and priority_function is None and heuristic is None:
+        raise ValueError("give priority_function or heuristic")
     parent_state.clear()
     state_cost.clear()
-    state = State(np.array(set()))
+    masks = bitmasks(lists)
+    costs = [len(l) for l in lists]
+    root, rootCost = 0, 0
+    if preprocess:
+        reduction = reduce_problem(N, masks, costs)
+        if stats is not None:
+            stats.update(reduction.stats)
+        if reduction.covered is None:
+            return 0, 0
+        masks, costs = reduction.masks, reduction.costs
+        root, rootCost = reduction.covered, reduction.cost
+    if strategy in ("ida", "sma"):
+        h = make_heuristic(heuristic or "uncovered", N, masks, costs)
+        if strategy == "ida":
+            return _ida_search(N, masks, costs, h, parent_state, state_cost, root, rootCost)
+        if max_nodes is None and max_bytes is not None:
+            max_nodes = max_bytes // _SMANode.BYTES
+        return _sma_search(N, masks, costs, h, parent_state, state_cost, max_nodes, root, rootCost)
+    if strategy != "astar":
+        raise ValueError(f"Unknown strategy {strategy!r}")
+    state = State(root)
     parent_state[state] = None
-    state_cost[state] = 0
+    state_cost[state] = rootCost
     numOfNodes = 0
-    numOfElements = 0
+    numOfElements = rootCost
     frontier = PriorityQueue()
-    s = state.copy_data()
+
+    if heuristic is not None:
+        h = make_heuristic(heuristic, N, masks, costs)
+        estimate = {state: h.evaluate(state.data)}
+        evaluated = {state}
+        priority_function = lambda s: (state_cost[s] + estimate[s], estimate[s])
+    
+    incidence = Incidence.from_masks(N, masks)
+    #high-water mark of the frontier, the bulk of the memory of A*
+    peak = 0
     
-    while(state is not None and not goal_test(N, s)):
-        for a in range(len(lists)):
-            newState = s
-            cost = 0
-            if not set(lists[a]) < s:
-                newState = s | set(lists[a])
-                cost = len(lists[a])
-            new = State(np.array(newState))
+    while(state is not None and not goal_test(N, state)):
+        s = state.data
+        #actions that add no new element lead back to the same state
+        for a in np.flatnonzero(incidence.gains(s)):
+            mask, cost = masks[a], costs[a]
+            new = State(s | mask)
             if new not in state_cost and new not in frontier:
                 parent_state[new] = state
                 state_cost[new] = state_cost[state] + cost
-                frontier.push(new, p=priority_function(newState))
+                if heuristic is not None:
+                    estimate[new] = h.child(s, estimate[state], new.data, cost)
+                frontier.push(new, p=priority_function(new))
             elif new in frontier and state_cost[new] > state_cost[state] + cost:
                 parent_state[new] = state
                 state_cost[new] = state_cost[state] + cost
+                frontier.decrease_key(new, priority_function(new))
+            elif heuristic is not None and state_cost[new] > state_cost[state] + cost:
+                #a cheaper path to an expanded state: reopen it
+                parent_state[new] = state
+                state_cost[new] = state_cost[state] + cost
+                frontier.push(new, p=priority_function(new))
+        peak = max(peak, len(frontier))
         
-        if frontier:
+        state = None
+        while frontier:
             state = frontier.pop()
+            if heuristic is None or not h.deferred or state in evaluated:
+                break
+            #deferred heuristics are evaluated once, when the state is first about to be expanded
+            evaluated.add(state)
+            exact = h.evaluate(state.data)
+            if exact <= estimate[state]:
+                break
+            estimate[state] = exact
+            frontier.push(state, p=priority_function(state))
+            state = None
+
+        if state is not None:
             numOfElements = state_cost[state]
             numOfNodes += 1 
         else:
-            state = None
             numOfElements = 0
             numOfNodes = 0
-        s = state.copy_data()
         
+    if stats is not None:
+        stats["frontier"] = peak
     return numOfElements, numOfNodes
 
-def problem(N, seed=None):
-    random.seed(seed)
-    return [
-        list(set(random.randint(0, N - 1) for n in range(random.randint(N // 5, N // 2))))
-        for n in range(random.randint(N, N * 5))
-    ]
-    
+Solution = namedtuple("Solution", ["elements", "lists", "lower_bound", "gap", "nodes"])
 
-if __name__ == "__main__":
-    for N in [5, 10, 20, 100, 500, 1000]:
-        lists = problem(N, 42)
-        parent_state = dict()
-        state_cost = dict()
-        numOfElements, numOfNodes = search(N, lists, parent_state=parent_state, state_cost=state_cost, priority_function=lambda s: (-len(s), state_cost[State(np.array(s))]))
-        print(f"For N = {N}: number of elements = {numOfElements}, number of nodes = {numOfNodes}")
-    
+def anytime_search(N, lists, heuristic="uncovered", preprocess: bool = True, dive: int = 16, time_limit: float = None,
+                   stats: dict = None):
+    """A* with an incumbent, yielding a Solution every time a cheaper cover is found.
+
+    The first Solution is a greedy cover. Frontier states whose cost +
+    heuristic cannot beat the incumbent are pruned, and every `dive`
+    expansions the state just expanded is completed greedily for a new
+    candidate. `lists` are the indices of the picked lists, `lower_bound` the
+    best of the LP/dual bound of the problem and the lowest cost + heuristic
+    left in the frontier, and `gap` = (elements - lower_bound) / elements.
+    The last Solution has gap 0 unless `time_limit` seconds run out first,
+    in which case it repeats the incumbent with the latest lower bound; the
+    iteration can also be stopped at any point, the latest Solution being a
+    cover within its gap of the optimum.
+    """
+    deadline = time.perf_counter() + time_limit if time_limit is not None else math.inf
+    masks = bitmasks(lists)
+    costs = [len(l) for l in lists]
+    index = list(range(len(lists)))
+    root, rootCost, forced = 0, 0, list()
+    if preprocess:
+        reduction = reduce_problem(N, masks, costs)
+        if stats is not None:
+            stats.update(reduction.stats)
+        if reduction.covered is None:
+            return
+        masks, costs, index = reduction.masks, reduction.costs, reduction.index
+        root, rootCost, forced = reduction.covered, reduction.cost, reduction.forced
+    goal = (1 << N) - 1
+    incidence = Incidence.from_masks(N, masks)
+    extra, picks = greedy_cover(N, masks, costs, root, incidence)
+    if picks is None:
+        return
+    upper = rootCost + extra
+    lower = rootCost + lower_bound(N, masks, costs, root, incidence)
+    nodes = 0
+
+    def solution():
+        gap = (upper - lower) / upper if upper else 0.0
+        return Solution(upper, forced + [index[a] for a in picks], lower, gap, nodes)
+
+    def path(s):
+        actions = list()
+        while parent[s] is not None:
+            s, a = parent[s]
+            actions.append(a)
+        return actions[::-1]
+
+    yield solution()
+    h = make_heuristic(heuristic, N, masks, costs)
+    cost = {root: rootCost}
+    parent = {root: None}
+    estimate = {root: h.evaluate(root)}
+    evaluated = {root}
+    frontier = PriorityQueue()
+    frontier.push(root, p=(rootCost + estimate[root], estimate[root]))
+    pruned = 0
+    while frontier and lower < upper:
+        if time.perf_counter() > deadline:
+            break
+        s = frontier.pop()
+        if cost[s] + estimate[s] >= upper:
+            #the frontier is ordered by cost + heuristic: nothing left can beat the incumbent
+            pruned += len(frontier) + 1
+            break
+        if h.deferred and s not in evaluated:
+            evaluated.add(s)
+            exact = h.evaluate(s)
+            if exact > estimate[s]:
+                estimate[s] = exact
+                frontier.push(s, p=(cost[s] + exact, exact))
+                continue
+        lower = max(lower, cost[s] + estimate[s])
+        nodes += 1
+        if dive and nodes % dive == 0:
+            extra, more = greedy_cover(N, masks, costs, s, incidence)
+            if cost[s] + extra < upper:
+                upper, picks = cost[s] + extra, path(s) + more
+                yield solution()
+        for a in np.flatnonzero(incidence.gains(s)):
+            new = s | masks[a]
+            g = cost[s] + costs[a]
+            if g >= cost.get(new, math.inf):
+                continue
+            if new == goal:
+                if g < upper:
+                    upper, picks = g, path(s) + [int(a)]
+                    yield solution()
+                continue
+            #any admissible estimate of a state holds on every path to it
+            hn = max(estimate.get(new, 0), h.child(s, estimate[s], new, costs[a]))
+            if g + hn >= upper:
+                pruned += 1
+                continue
+            cost[new] = g
+            parent[new] = (s, int(a))
+            estimate[new] = hn
+            if new in frontier:
+                frontier.remove(new)
+            frontier.push(new, p=(g + hn, hn))
+    if stats is not None:
+        stats.update(nodes=nodes, pruned=pruned)
+    if time.perf_counter() > deadline:
+        yield solution()
+    elif lower < upper:
+        #the incumbent outlived every state that could improve on it
+        lower = upper
+        yield solution()
+
+def _store_path(path, parent_state, state_cost):
+    """Fills the search dictionaries with a solution path of (bitmask, cost) pairs"""
+    parent = None
+    for mask, cost in path:
+        state = State(mask)
+        parent_state[state] = parent
+        state_cost[state] = cost
+        parent = state
+
+def _ida_search(N, masks, costs, h, parent_state, state_cost, root=0, rootCost=0):
+    """Iterative-deepening A*: depth-first searches bounded by cost + heuristic.
+
+    Lists are only picked in increasing index order, so each set of picked
+    lists is visited once per iteration instead of once per permutation.
+    """
+    goal = (1 << N) - 1
+    path = [(root, rootCost)]
+    numOfNodes = 0
+
+    def dfs(s, g, hs, first, bound):
+        nonlocal numOfNodes
+        if hs > 0 and h.deferred:
+            hs = max(hs, h.evaluate(s))
+        if g + hs > bound:
+            return g + hs
+        if s == goal:
+            return None
+        numOfNodes += 1
+        children = list()
+        for a in range(first, len(masks)):
+            if masks[a] | s == s:
+                continue
+            new = s | masks[a]
+            children.append((g + costs[a] + h.child(s, hs, new, costs[a]), a, new))
+        children.sort()
+        smallest = math.inf
+        for f, a, new in children:
+            if f > bound:
+                smallest = min(smallest, f)
+                break
+            path.append((new, g + costs[a]))
+            t = dfs(new, g + costs[a], f - g - costs[a], a + 1, bound)
+            if t is None:
+                return None
+            path.pop()
+            smallest = min(smallest, t)
+        return smallest
+
+    bound = rootCost + h.evaluate(root)
+    while bound < math.inf:
+        bound = dfs(root, rootCost, h.evaluate(root), 0, bound)
+        if bound is None:
+            _store_path(path, parent_state, state_cost)
+            return path[-1][1], numOfNodes
+    return 0, 0
+
+class _SMANode:
+    __slots__ = ("state", "cost", "h", "f", "depth", "parent", "first", "children", "forgotten", "evaluated")
+
+    #rough size of a node together with its heap entries
+    BYTES = 400
+
+    def __init__(self, state, cost, h, f, depth, parent, first):
+        self.state = state
+        self.cost = cost
+        self.h = h
+        self.f = f
+        self.depth = depth
+        self.parent = parent
+        self.first = first
+        self.children = None
+        #backed-up f of the children that were forgotten, by action
+        self.forgotten = dict()
+        self.evaluated = False
+
+def _sma_search(N, masks, costs, h, parent_state, state_cost, max_nodes, root=0, rootCost=0):
+    """Simplified memory-bounded A*.
+
+    Behaves like A* until `max_nodes` nodes are held in memory. Then the
+    leaves with the highest f are forgotten, and their parent remembers
+    their f. The parent goes back into the frontier with the lowest
+    forgotten f, and it brings back one forgotten child at a time when
+    nothing cheaper is left. Like in IDA*, lists are picked in increasing
+    index order, so the nodes form a tree.
+    """
+    goal = (1 << N) - 1
+    if max_nodes is None:
+        max_nodes = math.inf
+    #leaves by f, and expanded nodes with forgotten children by their lowest f
+    frontier = PriorityQueue()
+    #leaves only, highest f and then shallowest first
+    worst = PriorityQueue()
+    inMemory = 0
+    numOfNodes = 0
+
+    def add(node):
+        nonlocal inMemory
+        inMemory += 1
+        frontier.push(node, p=(node.f, -node.depth))
+        worst.push(node, p=(-node.f, node.depth))
+
+    def forget(node):
+        nonlocal inMemory
+        inMemory -= 1
+        if node in frontier:
+            frontier.remove(node)
+        if node in worst:
+            worst.remove(node)
+        parent = node.parent
+        if parent is None:
+            return
+        del parent.children[node.first - 1]
+        if node.f < math.inf:
+            parent.forgotten[node.first - 1] = node.f
+            if parent in frontier:
+                frontier.decrease_key(parent, (node.f, -parent.depth))
+            else:
+                frontier.push(parent, p=(node.f, -parent.depth))
+        if not parent.children:
+            if not parent.forgotten:
+                #every child was a dead end, so the parent is one too
+                parent.f = math.inf
+                forget(parent)
+            else:
+                parent.f = max(parent.f, min(parent.forgotten.values()))
+                worst.push(parent, p=(-parent.f, parent.depth))
+
+    node = _SMANode(root, rootCost, h.evaluate(root), 0, 0, None, 0)
+    node.f = node.cost + node.h
+    node.evaluated = True
+    add(node)
+
+    while frontier:
+        node = frontier.pop()
+        if node in worst:
+            worst.remove(node)
+        s = node.state
+        if h.deferred and not node.evaluated:
+            node.evaluated = True
+            node.h = max(node.h, h.evaluate(s))
+            if node.cost + node.h > node.f:
+                node.f = node.cost + node.h
+                inMemory -= 1
+                add(node)
+                continue
+        if s == goal:
+            path = list()
+            while node is not None:
+                path.append((node.state, node.cost))
+                node = node.parent
+            _store_path(reversed(path), parent_state, state_cost)
+            return path[0][1], numOfNodes
+        numOfNodes += 1
+        if node.children is None:
+            node.children = dict()
+            actions = [a for a in range(node.first, len(masks)) if masks[a] | s != s]
+        else:
+            #bring back the best forgotten child, with the f backed up before it was forgotten
+            actions = [min(node.forgotten, key=node.forgotten.get)]
+        best = None
+        for a in actions:
+            new = s | masks[a]
+            g = node.cost + costs[a]
+            hc = h.child(s, node.h, new, costs[a])
+            #pathmax keeps f monotone along every path
+            f = max(node.f, g + hc, node.forgotten.pop(a, 0))
+            child = _SMANode(new, g, hc, f, node.depth + 1, node, a + 1)
+            node.children[a] = child
+            add(child)
+            if best is None or child.f < best.f:
+                best = child
+        if node.forgotten:
+            frontier.push(node, p=(min(node.forgotten.values()), -node.depth))
+        if not node.children:
+            #a dead end: nothing left to pick can complete the cover
+            node.f = math.inf
+            forget(node)
+        #the best new child is kept, otherwise the same child could be forgotten over and over
+        while inMemory > max_nodes and len(worst) > 1 and worst.peek() is not best:
+            forget(worst.peek())
+    return 0, 0
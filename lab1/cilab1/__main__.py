@@ -0,0 +1,40 @@
+import argparse
+import time
+from cilab1 import HEURISTICS, anytime_search, problem, search
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--sizes', type=int, nargs='+', default=[5, 10, 20, 100, 500, 1000],
+                        help='problem sizes to solve')
+    parser.add_argument('--heuristic', choices=sorted(HEURISTICS),
+                        help='run A* with this heuristic instead of the greedy best-first search')
+    parser.add_argument('--strategy', choices=['astar', 'ida', 'sma'], default='astar',
+                        help='search used with --heuristic; ida and sma keep memory bounded')
+    parser.add_argument('--max-nodes', type=int, help='node budget of the sma strategy')
+    parser.add_argument('--anytime', type=float, metavar='SECONDS',
+                        help='report every improving cover with its optimality gap, stopping after SECONDS')
+    parser.add_argument('-v', '--verbose', action='store_true', help='report what preprocessing pruned')
+    args = parser.parse_args()
+
+    for N in args.sizes:
+        lists = problem(N, 42)
+        parent_state = dict()
+        state_cost = dict()
+        stats = dict()
+        if args.anytime is not None:
+            start = time.perf_counter()
+            for solution in anytime_search(N, lists, heuristic=args.heuristic or "uncovered", time_limit=args.anytime,
+                                           stats=stats):
+                print(f"For N = {N}: number of elements = {solution.elements}, lower bound = {solution.lower_bound}, "
+                      f"gap = {solution.gap:.1%} after {time.perf_counter() - start:.2f}s")
+            continue
+        if args.heuristic:
+            numOfElements, numOfNodes = search(N, lists, parent_state=parent_state, state_cost=state_cost, heuristic=args.heuristic,
+                                               strategy=args.strategy, max_nodes=args.max_nodes, stats=stats)
+        else:
+            numOfElements, numOfNodes = search(N, lists, parent_state=parent_state, state_cost=state_cost, priority_function=lambda s: (-len(s), state_cost[s]), stats=stats)
+        print(f"For N = {N}: number of elements = {numOfElements}, number of nodes = {numOfNodes}")
+        if args.verbose:
+            print(f"  {stats['lists']} lists: {stats['duplicates']} duplicated, {stats['dominated']} dominated, "
+                  f"{stats['useless']} useless, {stats['forced']} forced, {stats['remaining']} left to search")
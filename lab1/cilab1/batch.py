@@ -0,0 +1,100 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import resource
+import signal
+import sys
+import time
+from collections import namedtuple
+from cilab1 import problem, search
+
+
+Case = namedtuple("Case", ["N", "seed", "strategy", "heuristic"])
+
+STRATEGIES = ["greedy", "astar", "ida", "sma"]
+
+class CaseTimeout(Exception):
+    pass
+
+def _alarm(signum, frame):
+    raise CaseTimeout()
+
+def solve(case: Case, timeout: float = None) -> dict:
+    """Solves one case in the calling process and describes the outcome as a JSON-friendly dict"""
+    result = dict(case._asdict())
+    start = time.perf_counter()
+    if timeout:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        lists = problem(case.N, case.seed)
+        parent_state = dict()
+        state_cost = dict()
+        stats = dict()
+        if case.strategy == "greedy":
+            numOfElements, numOfNodes = search(case.N, lists, parent_state, state_cost,
+                                               priority_function=lambda s: (-len(s), state_cost[s]), stats=stats)
+        else:
+            numOfElements, numOfNodes = search(case.N, lists, parent_state, state_cost, heuristic=case.heuristic,
+                                               strategy=case.strategy, stats=stats)
+        result.update(status="ok", elements=numOfElements, nodes=numOfNodes, pruned=stats)
+    except CaseTimeout:
+        result.update(status="timeout")
+    except MemoryError:
+        result.update(status="memory")
+    except Exception as e:
+        result.update(status="error", error=repr(e))
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+def _run_case(job) -> dict:
+    case, timeout, memory = job
+    if memory:
+        #every case gets a fresh worker (maxtasksperchild=1), so the cap is per case
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    return solve(case, timeout)
+
+def run(cases, processes: int = None, timeout: float = None, memory: int = None):
+    """Solves `cases` on a pool of worker processes and yields each result as soon as it is ready.
+
+    `timeout` is in seconds and `memory` in bytes of address space, both per case.
+    """
+    jobs = ((case, timeout, memory) for case in cases)
+    with multiprocessing.Pool(processes, maxtasksperchild=1) as pool:
+        yield from pool.imap_unordered(_run_case, jobs)
+
+def grid(sizes, seeds, strategies, heuristic="uncovered"):
+    return [Case(N, seed, strategy, None if strategy == "greedy" else heuristic)
+            for N, seed, strategy in itertools.product(sizes, seeds, strategies)]
+
+def _seeds(text):
+    """Either a comma-separated list of seeds or a range like 0-99"""
+    if "-" in text:
+        first, last = text.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(s) for s in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='solve a grid of set-covering cases in parallel, one JSON line per case')
+    parser.add_argument('-n', '--sizes', type=int, nargs='+', default=[5, 10, 20, 100, 500, 1000],
+                        help='problem sizes')
+    parser.add_argument('-s', '--seeds', type=_seeds, default=[42], help='seeds, e.g. 42 or 1,2,3 or 0-99')
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES, default=['greedy'])
+    parser.add_argument('--heuristic', default='uncovered', help='heuristic of the astar, ida and sma strategies')
+    parser.add_argument('-p', '--processes', type=int, help='worker processes (default: one per core)')
+    parser.add_argument('-t', '--timeout', type=float, help='seconds allowed to each case')
+    parser.add_argument('-m', '--memory', type=int, help='megabytes of memory allowed to each case')
+    parser.add_argument('-o', '--output', type=argparse.FileType('a'), default=sys.stdout,
+                        help='file the JSON lines are appended to')
+    args = parser.parse_args()
+
+    cases = grid(args.sizes, args.seeds, args.strategies, args.heuristic)
+    memory = args.memory * 2**20 if args.memory else None
+    for result in run(cases, args.processes, args.timeout, memory):
+        args.output.write(json.dumps(result) + "\n")
+        args.output.flush()
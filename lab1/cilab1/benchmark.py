@@ -0,0 +1,190 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+from cilab1 import PriorityQueue, State, bitmasks, problem, search
+
+
+SIZES = [5, 10, 20, 100, 500, 1000]
+
+BENCHMARKS = dict()
+
+def register_benchmark(name: str, sizes=SIZES):
+    """Makes a benchmark available under `name`.
+
+    The decorated function gets N, does its setup and returns the callable
+    that is timed; the callable may return a dict of counters (e.g. "nodes").
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, sizes)
+        return setup
+    return register
+
+
+@register_benchmark("search")
+def _search(N):
+    lists = problem(N, 42)
+
+    def run():
+        state_cost = dict()
+        stats = dict()
+        elements, nodes = search(N, lists, dict(), state_cost, priority_function=lambda s: (-len(s), state_cost[s]),
+                                 stats=stats)
+        return dict(elements=elements, nodes=nodes, frontier=stats["frontier"])
+    return run
+
+@register_benchmark("astar", sizes=[5, 10, 20])
+def _astar(N):
+    lists = problem(N, 42)
+
+    def run():
+        stats = dict()
+        elements, nodes = search(N, lists, dict(), dict(), heuristic="greedy", stats=stats)
+        return dict(elements=elements, nodes=nodes, frontier=stats["frontier"])
+    return run
+
+@register_benchmark("queue")
+def _queue(N):
+    rng = random.Random(N)
+    priorities = [rng.random() for _ in range(100 * N)]
+
+    def run():
+        frontier = PriorityQueue()
+        for item, p in enumerate(priorities):
+            frontier.push(item, p=p)
+        for item in range(0, len(priorities), 2):
+            frontier.decrease_key(item, priorities[item] / 2)
+        while frontier:
+            frontier.pop()
+        return dict(items=len(priorities))
+    return run
+
+@register_benchmark("state")
+def _state(N):
+    masks = bitmasks(problem(N, 42))
+    rng = random.Random(N)
+    unions = [masks[rng.randrange(len(masks))] | masks[rng.randrange(len(masks))] for _ in range(100 * N)]
+
+    def run():
+        seen = set()
+        for mask in unions:
+            seen.add(State(mask))
+        return dict(states=len(seen))
+    return run
+
+@register_benchmark("problem")
+def _problem(N):
+    def run():
+        problem(N, 42, cache=False)
+    return run
+
+@register_benchmark("problem-cached")
+def _problem_cached(N):
+    problem(N, 42)
+
+    def run():
+        problem(N, 42)
+    return run
+
+
+def measure(name: str, N: int, repeat: int = 5, min_time: float = 0.05) -> dict:
+    """Times one benchmark in the calling process.
+
+    Like timeit, each of the `repeat` rounds calls the benchmark as many
+    times as needed to last `min_time` seconds, and the best round gives the
+    time of one call; counters come from the last call.
+    """
+    setup, _ = BENCHMARKS[name]
+    run = setup(N)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            counters = run() or dict()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        rounds.append((time.perf_counter() - start) / number)
+    result = dict(seconds=min(rounds), median=sorted(rounds)[len(rounds) // 2], calls=number * repeat, **counters)
+    if "nodes" in counters:
+        result["nodes_per_second"] = counters["nodes"] / result["seconds"]
+    #kilobytes on Linux; every benchmark runs in a fresh worker, so the peak is its own
+    result["peak_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+def _measure(job):
+    return job[:2], measure(*job)
+
+def run(cases, repeat: int = 5, min_time: float = 0.05, processes: int = 1) -> dict:
+    """Measures (name, N) `cases`, each in a new process so that peak RSS is not shared"""
+    jobs = [(name, N, repeat, min_time) for name, N in cases]
+    results = dict()
+    #a single worker by default: benchmarks running side by side disturb each other's timings
+    with multiprocessing.Pool(processes, maxtasksperchild=1) as pool:
+        for (name, N), result in pool.imap(_measure, jobs):
+            results[f"{name}/N={N}"] = result
+    return results
+
+def compare(baseline: dict, results: dict, threshold: float = 0.2) -> list:
+    """Describes every result worse than `baseline` by more than `threshold` (0.2 = 20%), or with other elements"""
+    regressions = list()
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        #the cost of the solution found must not change at all
+        if "elements" in base and "elements" in result and result["elements"] != base["elements"]:
+            regressions.append(f"{key}: elements {base['elements']} -> {result['elements']}")
+        #higher is worse for these, lower for nodes per second
+        for metric in ("seconds", "peak_rss", "frontier"):
+            if metric in base and metric in result and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{key}: {metric} {base[metric]:.6g} -> {result[metric]:.6g}")
+        if "nodes_per_second" in base and "nodes_per_second" in result \
+                and result["nodes_per_second"] < base["nodes_per_second"] / (1 + threshold):
+            regressions.append(f"{key}: nodes_per_second {base['nodes_per_second']:.6g} -> {result['nodes_per_second']:.6g}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='time search(), PriorityQueue, State and problem() against a JSON baseline')
+    parser.add_argument('benchmarks', nargs='*', metavar='BENCHMARK',
+                        help=f'benchmarks to run, among {", ".join(sorted(BENCHMARKS))} (default: all)')
+    parser.add_argument('-n', '--sizes', type=int, nargs='+', help='problem sizes (default: each benchmark its own)')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='timed rounds per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds a round lasts at least')
+    parser.add_argument('-p', '--processes', type=int, default=1, help='benchmarks run side by side')
+    parser.add_argument('--save', metavar='FILE', help='write the results as the new baseline')
+    parser.add_argument('--compare', metavar='FILE', help='fail if the results regress from this baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='regression tolerated by --compare (0.2 = 20%%)')
+    args = parser.parse_args()
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+
+    cases = [(name, N) for name in args.benchmarks or sorted(BENCHMARKS) for N in args.sizes or BENCHMARKS[name][1]]
+    results = run(cases, args.repeat, args.min_time, args.processes)
+    for key, result in results.items():
+        extra = f", {result['nodes_per_second']:.0f} nodes/s" if "nodes_per_second" in result else ""
+        extra += f", frontier {result['frontier']}" if "frontier" in result else ""
+        print(f"{key:<28} {result['seconds'] * 1e3:10.3f} ms, peak RSS {result['peak_rss'] / 1024:.1f} MB{extra}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(dict(python=platform.python_version(), machine=platform.machine(), results=results), f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
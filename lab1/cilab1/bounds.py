@@ -0,0 +1,81 @@
+import math
+import numpy as np
+from .incidence import Incidence
+
+try:
+    from scipy.optimize import linprog
+except ImportError:
+    linprog = None
+
+
+def _prices(N, costs, covered, incidence):
+    """Cost per newly covered element of every list (inf for lists adding nothing) and the uncovered elements"""
+    gains = incidence.gains(covered)
+    prices = np.divide(np.asarray(costs, dtype=np.float64), gains, out=np.full(len(gains), np.inf), where=gains > 0)
+    uncovered = np.unpackbits(incidence.pack(((1 << N) - 1) & ~covered).view(np.uint8), count=N,
+                              bitorder="little").astype(bool)
+    return prices, uncovered
+
+def greedy_cover(N, masks, costs, covered=0, incidence=None):
+    """Covers what is left of `covered` picking, each time, the list with the lowest cost per new element.
+
+    Returns the cost and the indices of the picked lists, or (inf, None) if
+    some element is in no list.
+    """
+    full = (1 << N) - 1
+    incidence = incidence or Incidence.from_masks(N, masks)
+    cost_array = np.asarray(costs, dtype=np.float64)
+    total = 0
+    picks = list()
+    while covered != full:
+        gains = incidence.gains(covered)
+        if not gains.any():
+            return math.inf, None
+        best = int(np.argmin(np.divide(cost_array, gains, out=np.full(len(gains), np.inf), where=gains > 0)))
+        total += costs[best]
+        picks.append(best)
+        covered |= masks[best]
+    return total, picks
+
+def dual_bound(N, masks, costs, covered=0, incidence=None):
+    """Lower bound on the cost of covering what is left of `covered`.
+
+    Every uncovered element is priced at the lowest cost per new element of
+    the lists containing it: no list then pays more than it costs, which is a
+    feasible solution of the dual of the LP relaxation, so the prices sum to
+    at most the optimum.
+    """
+    incidence = incidence or Incidence.from_masks(N, masks)
+    prices, uncovered = _prices(N, costs, covered, incidence)
+    if not uncovered.any():
+        return 0
+    members = incidence.dense[:, uncovered] > 0
+    cheapest = np.where(members, prices[:, None], np.inf).min(axis=0, initial=np.inf)
+    if not np.isfinite(cheapest).all():
+        return math.inf
+    return math.ceil(cheapest.sum() - 1e-9)
+
+def lp_bound(N, masks, costs, covered=0, incidence=None):
+    """Optimum of the LP relaxation of what is left of `covered`, rounded up; None without SciPy"""
+    if linprog is None:
+        return None
+    incidence = incidence or Incidence.from_masks(N, masks)
+    prices, uncovered = _prices(N, costs, covered, incidence)
+    if not uncovered.any():
+        return 0
+    useful = np.isfinite(prices)
+    members = incidence.dense[np.ix_(useful, uncovered)]
+    result = linprog(np.asarray(costs, dtype=np.float64)[useful], A_ub=-members.T, b_ub=-np.ones(members.shape[1]),
+                     bounds=(0, 1), method="highs")
+    if result.status == 2:
+        return math.inf
+    if not result.success:
+        return None
+    return math.ceil(result.fun - 1e-6)
+
+def lower_bound(N, masks, costs, covered=0, incidence=None):
+    """The best of the dual bound and, when SciPy is installed, the LP bound"""
+    incidence = incidence or Incidence.from_masks(N, masks)
+    bound = dual_bound(N, masks, costs, covered, incidence)
+    lp = lp_bound(N, masks, costs, covered, incidence)
+    return bound if lp is None else max(bound, lp)
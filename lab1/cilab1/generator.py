@@ -0,0 +1,96 @@
+import os
+import random
+import numpy as np
+
+
+CACHE_DIR = os.environ.get("CILAB1_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "cilab1"))
+
+def iter_problem(N, seed=None):
+    """Yields the lists of problem(N, seed) one at a time, so that very large instances never sit in memory.
+
+    The generator has its own random.Random, the global random state is left untouched.
+    """
+    rng = random.Random(seed)
+    for n in range(rng.randint(N, N * 5)):
+        yield list(set(rng.randint(0, N - 1) for n in range(rng.randint(N // 5, N // 2))))
+
+
+class Instance:
+    """The lists of a cached instance, as read-only sequences of elements.
+
+    `elements` holds every list one after the other and list i is
+    elements[offsets[i]:offsets[i + 1]]; both arrays are memory-mapped .npy
+    files, so opening an instance reads nothing until its lists are used.
+    """
+
+    def __init__(self, N, offsets, elements):
+        self.N = N
+        self.offsets = offsets
+        self.elements = elements
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        return self.elements[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.elements[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+
+def _paths(N, seed, cache_dir):
+    base = os.path.join(cache_dir, f"{N}-{seed}")
+    return base + ".offsets.npy", base + ".elements.npy"
+
+def _write(N, seed, cache_dir):
+    """Generates the instance straight into the cache, one list at a time"""
+    os.makedirs(cache_dir, exist_ok=True)
+    offsets_path, elements_path = _paths(N, seed, cache_dir)
+    dtype = np.min_scalar_type(max(N - 1, 0))
+    raw = f"{elements_path}.{os.getpid()}.tmp"
+    offsets = [0]
+    with open(raw, "wb") as f:
+        for l in iter_problem(N, seed):
+            np.array(l, dtype=dtype).tofile(f)
+            offsets.append(offsets[-1] + len(l))
+    try:
+        #.npy needs the size up front, the raw elements are copied in once it is known
+        elements = np.lib.format.open_memmap(f"{elements_path}.{os.getpid()}.npy", mode="w+", dtype=dtype,
+                                             shape=(offsets[-1],))
+        if offsets[-1]:
+            elements[:] = np.memmap(raw, dtype=dtype, mode="r")
+        elements.flush()
+        del elements
+        np.save(f"{offsets_path}.{os.getpid()}.npy", np.array(offsets, dtype=np.int64))
+        #the offsets are renamed last: an instance is complete once its offsets exist
+        os.replace(f"{elements_path}.{os.getpid()}.npy", elements_path)
+        os.replace(f"{offsets_path}.{os.getpid()}.npy", offsets_path)
+    finally:
+        os.remove(raw)
+
+def instance(N, seed, cache_dir=None) -> Instance:
+    """The instance of problem(N, seed), generated on the first call and memory-mapped from the cache afterwards"""
+    cache_dir = cache_dir or CACHE_DIR
+    offsets_path, elements_path = _paths(N, seed, cache_dir)
+    if not os.path.exists(offsets_path):
+        _write(N, seed, cache_dir)
+    return Instance(N, np.load(offsets_path, mmap_mode="r"), np.load(elements_path, mmap_mode="r"))
+
+def problem(N, seed=None, cache=True):
+    """Creates an instance of the problem.
+
+    Instances with a seed are the same on every call and are cached on disk
+    under CACHE_DIR (or $CILAB1_CACHE); without a seed a new one is generated.
+    """
+    if seed is None or not cache:
+        return list(iter_problem(N, seed))
+    try:
+        return list(instance(N, seed))
+    except OSError:
+        #a read-only or full cache directory only costs the generation
+        return list(iter_problem(N, seed))
+
@@ -0,0 +1,123 @@
+import math
+import numpy as np
+from .incidence import Incidence
+
+
+HEURISTICS = dict()
+
+def register_heuristic(name: str):
+    """Makes a Heuristic subclass available to search() under `name`"""
+    def register(cls):
+        HEURISTICS[name] = cls
+        return cls
+    return register
+
+def make_heuristic(heuristic, N, masks, costs):
+    if isinstance(heuristic, Heuristic):
+        return heuristic
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic {heuristic!r}, expected one of {sorted(HEURISTICS)}")
+    return HEURISTICS[heuristic](N, masks, costs)
+
+
+class Heuristic:
+    """Admissible estimate of the cost still needed to cover every element.
+
+    States are the integer bitmasks of the covered elements. When `deferred`
+    is set, evaluate() is too expensive to run on every generated state:
+    search() then uses child() when a state is generated and calls evaluate()
+    only once the state reaches the top of the frontier.
+    """
+
+    deferred = False
+
+    def __init__(self, N, masks, costs):
+        self.full = (1 << N) - 1
+        self.masks = masks
+        self.costs = costs
+
+    def evaluate(self, state: int) -> int:
+        raise NotImplementedError
+
+    def child(self, parent: int, parent_h: int, state: int, cost: int) -> int:
+        """Estimate for `state`, reached from `parent` through an action costing `cost`"""
+        return self.evaluate(state)
+
+
+@register_heuristic("uncovered")
+class Uncovered(Heuristic):
+    """Every uncovered element adds at least 1 to the cost"""
+
+    def evaluate(self, state):
+        return (self.full & ~state).bit_count()
+
+    def child(self, parent, parent_h, state, cost):
+        return parent_h - (state ^ parent).bit_count()
+
+
+@register_heuristic("lists")
+class Lists(Heuristic):
+    """At least ceil(uncovered / size of the largest list) more lists, each costing at least the cheapest one"""
+
+    def __init__(self, N, masks, costs):
+        super().__init__(N, masks, costs)
+        self.largest = max((mask.bit_count() for mask in masks), default=1)
+        self.smallest = min(costs, default=0)
+
+    def evaluate(self, state):
+        return self._bound((self.full & ~state).bit_count())
+
+    def child(self, parent, parent_h, state, cost):
+        return self._bound((self.full & ~state).bit_count())
+
+    def _bound(self, uncovered):
+        return -(-uncovered // self.largest) * self.smallest
+
+
+@register_heuristic("greedy")
+class Greedy(Heuristic):
+    """Lower bound derived from a greedy cover of the uncovered elements.
+
+    Greedy is within a factor H(d) of the optimum, d being the largest number
+    of uncovered elements in a single list, so greedy / H(d) never overestimates.
+    The cheapest cost per element of the first greedy pick, paid by every
+    uncovered element, is a second bound; the larger of the two is used.
+    """
+
+    deferred = True
+
+    def __init__(self, N, masks, costs):
+        super().__init__(N, masks, costs)
+        self.incidence = Incidence.from_masks(N, masks)
+        self.cost_array = np.array(costs, dtype=np.float64)
+        self.harmonic = [0.0]
+        for i in range(1, N + 1):
+            self.harmonic.append(self.harmonic[-1] + 1 / i)
+
+    def evaluate(self, state):
+        size = (self.full & ~state).bit_count()
+        if not size:
+            return 0
+        total = 0
+        largest = 0
+        ratio = None
+        while state != self.full:
+            gains = self.incidence.gains(state)
+            if not gains.any():
+                #some uncovered element is in no list at all: there is no cover
+                return math.inf
+            if ratio is None:
+                largest = int(gains.max())
+            #the cheapest cost per newly covered element
+            best = int(np.argmin(np.divide(self.cost_array, gains, out=np.full(len(gains), np.inf), where=gains > 0)))
+            if ratio is None:
+                ratio = (self.costs[best], int(gains[best]))
+            total += self.costs[best]
+            state |= self.masks[best]
+        by_ratio = -(-size * ratio[0] // ratio[1])
+        by_greedy = math.ceil(total / self.harmonic[largest] - 1e-9)
+        return max(size, by_ratio, by_greedy)
+
+    def child(self, parent, parent_h, state, cost):
+        #pathmax: the parent's bound minus the action cost is still admissible
+        return max((self.full & ~state).bit_count(), parent_h - cost)
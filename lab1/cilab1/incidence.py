@@ -0,0 +1,89 @@
+import numpy as np
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Number of set bits in each row of uint64 words"""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    #NumPy < 2.0 has no bitwise_count: count the bits byte by byte
+    _BYTE_POPCOUNT = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """Number of set bits in each row of uint64 words"""
+        bytes_ = np.ascontiguousarray(words).view(np.uint8)
+        return _BYTE_POPCOUNT[bytes_].sum(axis=-1, dtype=np.int64)
+
+
+class Incidence:
+    """Lists × elements incidence matrix of a problem, one bit per element.
+
+    Row i packs the elements of list i into little-endian uint64 words, so
+    element e is bit e % 64 of word e // 64: the same layout as the integer
+    bitmasks of search(), which convert with pack()/unpack(). Selections are
+    boolean arrays over the lists, one row per candidate, and are evaluated
+    a whole batch at a time.
+    """
+
+    def __init__(self, N, lists):
+        self.N = N
+        self.words = (N + 63) // 64
+        dense = np.zeros((len(lists), self.words * 64), dtype=bool)
+        for i, l in enumerate(lists):
+            dense[i, list(l)] = True
+        self.packed = np.packbits(dense, axis=1, bitorder="little").view("<u8")
+        self.sizes = dense.sum(axis=1)
+        self._dense = None
+
+    @classmethod
+    def from_masks(cls, N, masks):
+        incidence = cls.__new__(cls)
+        incidence.N = N
+        incidence.words = (N + 63) // 64
+        data = b"".join(m.to_bytes(incidence.words * 8, "little") for m in masks)
+        incidence.packed = np.frombuffer(data, dtype="<u8").reshape(len(masks), incidence.words)
+        incidence.sizes = _popcount(incidence.packed)
+        incidence._dense = None
+        return incidence
+
+    def __len__(self):
+        return len(self.packed)
+
+    @property
+    def dense(self) -> np.ndarray:
+        """Unpacked matrix as float32, so that the coverage of a batch is one matrix product"""
+        if self._dense is None:
+            self._dense = np.unpackbits(self.packed.view(np.uint8), axis=1, count=self.N,
+                                        bitorder="little").astype(np.float32)
+        return self._dense
+
+    def pack(self, mask: int) -> np.ndarray:
+        return np.frombuffer(mask.to_bytes(self.words * 8, "little"), dtype="<u8")
+
+    def unpack(self, row: np.ndarray) -> int:
+        return int.from_bytes(row.astype("<u8").tobytes(), "little")
+
+    def gains(self, covered) -> np.ndarray:
+        """Number of elements not in `covered` (a bitmask or a packed row) that each list would add"""
+        if isinstance(covered, int):
+            covered = self.pack(covered)
+        return _popcount(self.packed & ~covered)
+
+    def covered(self, selections: np.ndarray) -> np.ndarray:
+        """Boolean matrix of the elements covered by each selection"""
+        selections = np.atleast_2d(selections)
+        return selections.astype(np.float32) @ self.dense > 0
+
+    def coverage(self, selections: np.ndarray) -> np.ndarray:
+        """Number of elements covered by each selection"""
+        return self.covered(selections).sum(axis=1)
+
+    def costs(self, selections: np.ndarray) -> np.ndarray:
+        """Total length of the lists in each selection"""
+        return np.atleast_2d(selections).astype(np.int64) @ self.sizes
+
+    def fitness(self, selections: np.ndarray) -> np.ndarray:
+        """Covered elements divided by the total length of each selection (0 for empty selections)"""
+        covered = self.coverage(selections)
+        costs = self.costs(selections)
+        return np.divide(covered, costs, out=np.zeros(len(costs)), where=costs > 0)
@@ -0,0 +1,81 @@
+from collections import namedtuple
+
+
+Reduction = namedtuple("Reduction", ["masks", "costs", "covered", "cost", "forced", "stats", "index"])
+
+def reduce_problem(N, masks, costs) -> Reduction:
+    """Shrinks a problem before searching it, without changing its optimal cost.
+
+    Repeats until nothing changes:
+    - drops lists that add nothing to the elements still uncovered,
+    - keeps a single list among those covering the same uncovered elements,
+    - drops a list when another one covers at least the same uncovered
+      elements at no greater cost,
+    - picks the lists that are the only ones covering some element.
+
+    `covered` and `cost` are what the forced picks already cover and cost,
+    `forced` their indices in the original lists, `index` the original index
+    of each list kept, and `covered` is None if some element is in no list at
+    all.
+    """
+    full = (1 << N) - 1
+    stats = dict(lists=len(masks), useless=0, duplicates=0, dominated=0, forced=0)
+    index = list(range(len(masks)))
+    covered = 0
+    cost = 0
+    forced = list()
+    sized = all(c == m.bit_count() for m, c in zip(masks, costs))
+
+    changed = True
+    while changed:
+        changed = False
+        uncovered = full & ~covered
+
+        #the cheapest list for each set of uncovered elements it adds
+        cheapest = dict()
+        for i in index:
+            key = masks[i] & uncovered
+            if not key:
+                stats["useless"] += 1
+            elif key not in cheapest:
+                cheapest[key] = i
+            else:
+                stats["duplicates"] += 1
+                if costs[i] < costs[cheapest[key]]:
+                    cheapest[key] = i
+        index = sorted(cheapest.values(), key=lambda i: (costs[i], -(masks[i] & uncovered).bit_count()))
+
+        #with nothing covered yet and every list costing its size, a list is only dominated by an identical one,
+        #already dropped above
+        if covered or not sized:
+            kept = list()
+            for i in index:
+                a = masks[i] & uncovered
+                #lists are sorted by cost, so only those kept so far can dominate this one
+                if any(a & ~masks[j] == 0 for j in kept):
+                    stats["dominated"] += 1
+                else:
+                    kept.append(i)
+            index = kept
+
+        once, twice = 0, 0
+        for i in index:
+            twice |= once & masks[i]
+            once |= masks[i]
+        if uncovered & ~once:
+            stats["remaining"] = 0
+            return Reduction(list(), list(), None, cost, forced, stats, list())
+        single = uncovered & ~twice
+        for i in index:
+            if masks[i] & single:
+                forced.append(i)
+                covered |= masks[i]
+                cost += costs[i]
+                stats["forced"] += 1
+                changed = True
+        if changed:
+            index = [i for i in index if i not in forced]
+
+    stats["remaining"] = len(index)
+    index.sort()
+    return Reduction([masks[i] for i in index], [costs[i] for i in index], covered, cost, forced, stats, index)
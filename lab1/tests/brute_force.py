@@ -0,0 +1,45 @@
+import itertools
+import math
+import random
+import signal
+from contextlib import contextmanager
+
+
+def optimum(N, lists, covered=0):
+    """Cheapest total size of lists covering every element not in `covered`, trying every subset; inf if none does"""
+    full = (1 << N) - 1
+    masks = [sum(1 << e for e in l) for l in lists]
+    best = math.inf
+    for n in range(len(lists) + 1):
+        for picked in itertools.combinations(range(len(lists)), n):
+            state = covered
+            for i in picked:
+                state |= masks[i]
+            if state == full:
+                best = min(best, sum(len(lists[i]) for i in picked))
+    return best
+
+def instances(count, seed=0, feasible=True):
+    """Small random problems, with at most 10 lists so that optimum() stays fast"""
+    rng = random.Random(seed)
+    found = list()
+    while len(found) < count:
+        N = rng.randint(3, 8)
+        lists = [rng.sample(range(N), rng.randint(1, max(1, N // 2))) for _ in range(rng.randint(2, 10))]
+        if (optimum(N, lists) < math.inf) == feasible:
+            found.append((N, lists))
+    return found
+
+@contextmanager
+def deadline(seconds):
+    """Fails the test instead of hanging it once `seconds` have passed"""
+    def expire(signum, frame):
+        raise TimeoutError(f"still running after {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
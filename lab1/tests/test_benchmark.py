@@ -0,0 +1,18 @@
+from cilab1 import problem, search
+from cilab1.benchmark import compare
+
+
+def test_strategies_agree():
+    N = 5
+    lists = problem(N, 42, cache=False)
+    results = dict()
+    for strategy in ("astar", "ida", "sma"):
+        for heuristic in ("uncovered", "lists", "greedy"):
+            elements, nodes = search(N, lists, dict(), dict(), heuristic=heuristic, strategy=strategy)
+            results[f"{strategy}-{heuristic}"] = dict(elements=elements, nodes=nodes)
+    baseline = {key: results["astar-uncovered"] for key in results}
+    assert compare(baseline, results) == list()
+    #a different cost is a regression, however small
+    results["astar-uncovered"] = dict(elements=baseline["astar-uncovered"]["elements"] + 1)
+    assert compare(baseline, results) == [f"astar-uncovered: elements {baseline['astar-uncovered']['elements']} -> "
+                                          f"{results['astar-uncovered']['elements']}"]
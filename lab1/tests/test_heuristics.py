@@ -0,0 +1,44 @@
+import math
+import random
+import pytest
+from cilab1 import HEURISTICS, bitmasks, make_heuristic, search
+from cilab1.heuristics import Greedy
+from .brute_force import instances, optimum
+
+
+#element 4 is in no list: the greedy cover runs out of useful lists after the first pick
+UNCOVERABLE = (7, [[1], [0], [5, 6]])
+
+
+def test_greedy_without_cover():
+    N, lists = UNCOVERABLE
+    assert Greedy(N, bitmasks(lists), [len(l) for l in lists]).evaluate(0) == math.inf
+
+
+def test_search_greedy_without_cover():
+    N, lists = UNCOVERABLE
+    for strategy in ("astar", "ida", "sma"):
+        assert search(N, lists, dict(), dict(), heuristic="greedy", strategy=strategy, preprocess=False) == (0, 0)
+
+
+@pytest.mark.parametrize("name", sorted(HEURISTICS))
+def test_admissible(name):
+    rng = random.Random(1)
+    for N, lists in instances(20):
+        masks = bitmasks(lists)
+        h = make_heuristic(name, N, masks, [len(l) for l in lists])
+        for _ in range(5):
+            state = 0
+            for i in rng.sample(range(len(lists)), rng.randint(0, len(lists) - 1)):
+                state |= masks[i]
+            remaining = optimum(N, lists, state)
+            assert h.evaluate(state) <= remaining
+            #child estimates stay admissible too
+            for i, mask in enumerate(masks):
+                if state | mask != state:
+                    assert h.child(state, h.evaluate(state), state | mask, len(lists[i])) <= optimum(N, lists, state | mask)
+
+def test_lists_with_other_costs():
+    #one list covers everything for 1: costs that are not sizes must not be taken for sizes
+    masks = bitmasks([[0, 1, 2, 3], [0]])
+    assert make_heuristic("lists", 4, masks, [1, 1]).evaluate(0) <= 1
@@ -0,0 +1,50 @@
+import math
+from cilab1 import bitmasks, dual_bound, greedy_cover, lower_bound, reduce_problem
+from .brute_force import instances, optimum
+
+
+def test_reduction_keeps_optimum():
+    for N, lists in instances(40):
+        reduction = reduce_problem(N, bitmasks(lists), [len(l) for l in lists])
+        kept = [lists[i] for i in reduction.index]
+        assert reduction.masks == bitmasks(kept)
+        assert reduction.cost == sum(len(lists[i]) for i in reduction.forced)
+        assert reduction.covered == bitmasks([sum((lists[i] for i in reduction.forced), [])])[0]
+        assert not set(reduction.forced) & set(reduction.index)
+        assert reduction.cost + optimum(N, kept, reduction.covered) == optimum(N, lists)
+        assert reduction.stats["remaining"] == len(kept)
+
+def test_reduction_without_cover():
+    for N, lists in instances(10, feasible=False):
+        reduction = reduce_problem(N, bitmasks(lists), [len(l) for l in lists])
+        assert reduction.covered is None and reduction.masks == list()
+
+def test_reduction_drops():
+    #list 1 repeats list 0; 3 and 5 are the only lists with 3 and 5, and then 2 and 4 add nothing
+    lists = [[0, 1], [1, 0], [2], [2, 3], [4], [4, 5]]
+    reduction = reduce_problem(6, bitmasks(lists), [len(l) for l in lists])
+    assert sorted(reduction.forced) == [0, 3, 5]
+    assert reduction.index == list()
+    assert reduction.cost == 6 and reduction.covered == 0b111111
+    assert reduction.stats["duplicates"] == 1 and reduction.stats["useless"] == 2
+
+def test_bounds():
+    for N, lists in instances(40):
+        masks, costs = bitmasks(lists), [len(l) for l in lists]
+        cost, picks = greedy_cover(N, masks, costs)
+        assert cost == sum(costs[i] for i in picks)
+        assert set().union(*(lists[i] for i in picks)) == set(range(N))
+        assert dual_bound(N, masks, costs) <= lower_bound(N, masks, costs) <= optimum(N, lists) <= cost
+
+def test_bounds_without_cover():
+    for N, lists in instances(10, feasible=False):
+        masks, costs = bitmasks(lists), [len(l) for l in lists]
+        assert greedy_cover(N, masks, costs) == (math.inf, None)
+        assert dual_bound(N, masks, costs) == math.inf
+
+def test_reduction_with_other_costs():
+    #costs need not be the sizes of the lists: [0, 1] is cheaper than [0] and [1], which it dominates
+    masks, costs = bitmasks([[0, 1], [0], [1]]), [1, 2, 2]
+    reduction = reduce_problem(2, masks, costs)
+    assert reduction.stats["dominated"] == 2
+    assert reduction.forced == [0] and reduction.cost == 1 and reduction.index == list()
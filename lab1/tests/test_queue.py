@@ -0,0 +1,50 @@
+import random
+from cilab1 import PriorityQueue
+
+
+def test_matches_reference():
+    rng = random.Random(0)
+    queue = PriorityQueue()
+    reference = dict()
+    for step in range(5000):
+        operation = rng.random()
+        if operation < 0.4 or not reference:
+            item = rng.randrange(1000)
+            if item not in reference:
+                reference[item] = rng.randrange(100)
+                queue.push(item, p=reference[item])
+        elif operation < 0.6:
+            item = rng.choice(list(reference))
+            p = rng.randrange(100)
+            assert queue.decrease_key(item, p) == (p < reference[item])
+            reference[item] = min(reference[item], p)
+        elif operation < 0.75:
+            item = rng.choice(list(reference))
+            queue.remove(item)
+            del reference[item]
+        else:
+            lowest = min(reference.values())
+            assert reference.pop(queue.pop()) == lowest
+        assert len(queue) == len(reference)
+        for item, p in reference.items():
+            assert item in queue and queue.priority(item) == p
+    #items come out by priority
+    popped = [reference[queue.pop()] for _ in range(len(queue))]
+    assert popped == sorted(popped)
+
+def test_ties_in_insertion_order():
+    queue = PriorityQueue()
+    for item in ("c", "a", "b"):
+        queue.push(item, p=1)
+    queue.push("d", p=0)
+    #a lowered item keeps its place in the insertion order
+    queue.decrease_key("b", 0)
+    assert [queue.pop() for _ in range(4)] == ["b", "d", "c", "a"]
+
+def test_default_priority_is_fifo():
+    queue = PriorityQueue()
+    for item in range(10):
+        queue.push(item)
+    queue.remove(4)
+    assert not queue.decrease_key(7, 9)
+    assert [queue.pop() for _ in range(len(queue))] == [0, 1, 2, 3, 5, 6, 7, 8, 9]
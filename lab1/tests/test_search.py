@@ -0,0 +1,73 @@
+import pytest
+from cilab1 import HEURISTICS, State, anytime_search, search
+from .brute_force import deadline, instances, optimum
+
+
+FEASIBLE = instances(30)
+INFEASIBLE = instances(10, feasible=False)
+STRATEGIES = [dict(strategy="astar"), dict(strategy="ida"), dict(strategy="sma"),
+              dict(strategy="sma", max_nodes=32)]
+
+
+def covers(N, lists, picked):
+    return set().union(*(lists[i] for i in picked)) == set(range(N))
+
+@pytest.mark.parametrize("preprocess", [True, False])
+@pytest.mark.parametrize("heuristic", sorted(HEURISTICS))
+@pytest.mark.parametrize("options", STRATEGIES, ids=lambda o: "-".join(map(str, o.values())))
+def test_optimal(options, heuristic, preprocess):
+    for N, lists in FEASIBLE:
+        parent_state, state_cost = dict(), dict()
+        with deadline(10):
+            elements, nodes = search(N, lists, parent_state, state_cost, heuristic=heuristic, preprocess=preprocess,
+                                     **options)
+        assert elements == optimum(N, lists), lists
+        goal = State((1 << N) - 1)
+        assert state_cost[goal] == elements
+        #the stored path only ever adds elements, from the root to the goal
+        state = goal
+        while parent_state[state] is not None:
+            assert parent_state[state].issubset(state) and parent_state[state] != state
+            state = parent_state[state]
+
+@pytest.mark.parametrize("preprocess", [True, False])
+def test_greedy_priority_covers(preprocess):
+    for N, lists in FEASIBLE:
+        state_cost = dict()
+        elements, _ = search(N, lists, dict(), state_cost, priority_function=lambda s: (-len(s), state_cost[s]),
+                             preprocess=preprocess)
+        assert elements >= optimum(N, lists)
+
+@pytest.mark.parametrize("preprocess", [True, False])
+@pytest.mark.parametrize("heuristic", [None] + sorted(HEURISTICS))
+@pytest.mark.parametrize("options", STRATEGIES, ids=lambda o: "-".join(map(str, o.values())))
+def test_infeasible(options, heuristic, preprocess):
+    for N, lists in INFEASIBLE:
+        if heuristic is None and options["strategy"] == "astar":
+            options = dict(options, priority_function=len)
+        with deadline(10):
+            assert search(N, lists, dict(), dict(), heuristic=heuristic, preprocess=preprocess, **options) == (0, 0)
+
+@pytest.mark.parametrize("preprocess", [True, False])
+@pytest.mark.parametrize("heuristic", sorted(HEURISTICS))
+def test_anytime(heuristic, preprocess):
+    for N, lists in FEASIBLE:
+        with deadline(10):
+            solutions = list(anytime_search(N, lists, heuristic=heuristic, preprocess=preprocess, dive=2))
+        for solution in solutions:
+            assert covers(N, lists, solution.lists)
+            assert solution.elements == sum(len(lists[i]) for i in solution.lists)
+            assert solution.lower_bound <= optimum(N, lists) <= solution.elements
+        assert [s.elements for s in solutions] == sorted((s.elements for s in solutions), reverse=True)
+        assert solutions[-1].elements == optimum(N, lists) and solutions[-1].gap == 0
+
+@pytest.mark.parametrize("preprocess", [True, False])
+def test_anytime_infeasible(preprocess):
+    for N, lists in INFEASIBLE:
+        with deadline(10):
+            assert list(anytime_search(N, lists, preprocess=preprocess)) == list()
+
+def test_needs_an_order():
+    N, lists = FEASIBLE[0]
+    with pytest.raises(ValueError):
+        search(N, lists, dict(), dict())
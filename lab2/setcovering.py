@@ -0,0 +1,347 @@
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict, namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+
+#the problem generator and the incidence-matrix engine are shared with lab1
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lab1"))
+from cilab1.generator import problem
+from cilab1.incidence import Incidence
+
+
+class FitnessCache:
+    """Least-recently-used fitness values of at most `maxsize` genomes, with hit and miss counters"""
+
+    def __init__(self, maxsize=2**16):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key):
+        fitness = self._data.get(key)
+        if fitness is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return fitness
+
+    def put(self, key, fitness):
+        self._data[key] = fitness
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+MODES = ["generational", "steady", "plus", "comma"]
+
+Run = namedtuple("Run", ["population", "fitness", "best", "best_fitness", "generations", "evaluations", "stopped"])
+
+def genome_keys(genomes) -> list:
+    """A hashable key per genome: its bits packed into bytes"""
+    return [row.tobytes() for row in np.packbits(genomes, axis=1)]
+
+def _frozen(genomes):
+    genomes.flags.writeable = False
+    return genomes
+
+
+class SetCovering:
+    """Genetic algorithm for the set-covering problem(N, seed).
+
+    Genomes are the rows of a population x lists boolean matrix, genome i
+    holding list j if population[i, j]; equal lists share the column of
+    their first occurrence. Every operator works on a whole batch of genomes.
+    Populations are returned read-only and the operators only write into
+    the rows gathered for the offspring, so a genome never changes once
+    evaluated and its fitness can be cached (`cache_size` genomes at most,
+    0 for no cache).
+    """
+
+    def __init__(self, N, seed=42, rng=None, cache_size=2**16):
+        self.N = N
+        self.lists = problem(N, seed)
+        self.incidence = Incidence(N, self.lists)
+        first = dict()
+        self.canonical = np.array([first.setdefault(tuple(l), i) for i, l in enumerate(self.lists)])
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.cache = FitnessCache(cache_size) if cache_size else None
+
+    def covering(self, genomes):
+        """Fitness of each genome: covered elements / total elements; only genomes not in the cache are evaluated"""
+        if self.cache is None:
+            return self.incidence.fitness(genomes)
+        keys = genome_keys(genomes)
+        fitness = np.empty(len(keys))
+        missing = list()
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                fitness[i] = cached
+        if missing:
+            fitness[missing] = self.incidence.fitness(genomes[missing])
+            for i in missing:
+                self.cache.put(keys[i], fitness[i])
+        return fitness
+
+    def initial_population(self, size=None):
+        """Genomes of a single list each: every list once if `size` is None, random lists otherwise, best first"""
+        if size is None:
+            picks = self.canonical
+        else:
+            picks = self.canonical[self.rng.integers(len(self.lists), size=size)]
+        population = np.zeros((len(picks), len(self.lists)), dtype=bool)
+        population[np.arange(len(picks)), picks] = True
+        fitness = self.covering(population)
+        order = _best(fitness, len(fitness))
+        return _frozen(population[order]), fitness[order]
+
+    def tournament(self, fitness, n, tournament_size=2):
+        """Indices of the winners of n tournaments among tournament_size random individuals"""
+        contenders = self.rng.integers(len(fitness), size=(n, tournament_size))
+        return contenders[np.arange(n), fitness[contenders].argmax(axis=1)]
+
+    def cross_over(self, g1, g2):
+        """Each genome of g1 gets the first list of g2 it lacks, then loses the first list it has that g2 lacks.
+
+        The offspring are written over g1 unless it is read-only.
+        """
+        o = g1 if g1.flags.writeable else g1.copy()
+        rows = np.arange(len(o))
+        add = g2 & ~o
+        has = add.any(axis=1)
+        o[rows[has], add[has].argmax(axis=1)] = True
+        drop = o & ~g2
+        has = drop.any(axis=1)
+        o[rows[has], drop[has].argmax(axis=1)] = False
+        return o
+
+    def mutation(self, genomes):
+        """Adds or removes one random list in each genome, never leaving a genome empty.
+
+        The offspring are written over `genomes` unless it is read-only.
+        """
+        o = genomes if genomes.flags.writeable else genomes.copy()
+        rows = np.arange(len(o))
+        points = self.canonical[self.rng.integers(len(self.lists), size=len(o))]
+        flip = ~o[rows, points] | (o.sum(axis=1) > 1)
+        o[rows[flip], points[flip]] ^= True
+        return o
+
+    def breed(self, population, fitness, n, crossover_rate=0.3):
+        """n offspring, each by cross-over of two tournament winners or mutation of one"""
+        crossed = self.rng.random(n) < crossover_rate
+        c = crossed.sum()
+        offspring = np.empty((n, population.shape[1]), dtype=bool)
+        offspring[crossed] = self.cross_over(population[self.tournament(fitness, c)],
+                                             population[self.tournament(fitness, c)])
+        offspring[~crossed] = self.mutation(population[self.tournament(fitness, n - c)])
+        return offspring
+
+    def generation(self, population, fitness, offspring_size, crossover_rate=0.3, mode="plus", elitism=1):
+        """One generation of `mode` (a name in MODES), evaluating its offspring in one batch.
+
+        - "plus", (mu+lambda): the best of parents and offspring survive,
+        - "comma", (mu,lambda): the best offspring replace every parent
+          (offspring_size must be at least the population size),
+        - "generational": a whole new population, but for the `elitism` best
+          parents (offspring_size is not used),
+        - "steady": offspring bred one at a time, each replacing the worst
+          genome if it is fitter, so the next one can already descend from it.
+
+        The population must be sorted best first, as initial_population and
+        run() give it, and stays so.
+        """
+        mu = len(population)
+        if mode == "steady":
+            for _ in range(offspring_size):
+                child = self.breed(population, fitness, 1, crossover_rate)
+                f = self.covering(child)
+                if f[0] > fitness[-1]:
+                    #insertion point that keeps the population sorted, after the genomes as fit
+                    i = int(np.searchsorted(-fitness, -f[0], side="right"))
+                    population = np.vstack([population[:i], child, population[i:-1]])
+                    fitness = np.concatenate([fitness[:i], f, fitness[i:-1]])
+            return _frozen(population), fitness
+        if mode == "plus":
+            offspring = self.breed(population, fitness, offspring_size, crossover_rate)
+            merged = np.vstack([population, offspring])
+            merged_fitness = np.concatenate([fitness, self.covering(offspring)])
+        elif mode == "comma":
+            if offspring_size < mu:
+                raise ValueError(f"(mu,lambda) needs offspring_size >= {mu}, got {offspring_size}")
+            merged = self.breed(population, fitness, offspring_size, crossover_rate)
+            merged_fitness = self.covering(merged)
+        elif mode == "generational":
+            elitism = min(elitism, mu)
+            offspring = self.breed(population, fitness, mu - elitism, crossover_rate)
+            merged = np.vstack([population[:elitism], offspring])
+            merged_fitness = np.concatenate([fitness[:elitism], self.covering(offspring)])
+        else:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+        best = _best(merged_fitness, mu)
+        return _frozen(merged[best]), merged_fitness[best]
+
+    def evolve(self, population, fitness, generations, offspring_size, crossover_rate=0.3, mode="plus"):
+        for _ in range(generations):
+            population, fitness = self.generation(population, fitness, offspring_size, crossover_rate, mode)
+        return population, fitness
+
+    def run(self, population, fitness, offspring_size, mode="plus", generations=None, stagnation=None, target=None,
+            time_limit=None, crossover_rate=0.3, elitism=1) -> Run:
+        """Evolves until the first stopping rule applies.
+
+        - `generations`: that many generations have run,
+        - `stagnation`: the best fitness has not improved for that many generations,
+        - `target`: some genome reached that fitness,
+        - `time_limit`: that many seconds have passed.
+        """
+        if generations is None and stagnation is None and target is None and time_limit is None:
+            raise ValueError("No stopping rule: set generations, stagnation, target or time_limit")
+        deadline = time.perf_counter() + time_limit if time_limit is not None else math.inf
+        #the modes rely on the population being sorted best first
+        order = _best(fitness, len(fitness))
+        population, fitness = _frozen(population[order]), fitness[order]
+        best, best_fitness = population[0], fitness[0]
+        done = 0
+        stale = 0
+        evaluations = 0
+        while True:
+            if target is not None and best_fitness >= target:
+                stopped = "target"
+            elif generations is not None and done >= generations:
+                stopped = "generations"
+            elif stagnation is not None and stale >= stagnation:
+                stopped = "stagnation"
+            elif time.perf_counter() >= deadline:
+                stopped = "time"
+            else:
+                population, fitness = self.generation(population, fitness, offspring_size, crossover_rate, mode, elitism)
+                done += 1
+                evaluations += len(population) - min(elitism, len(population)) if mode == "generational" else offspring_size
+                #with (mu,lambda) the population can lose its best genome, the best ever is kept here
+                if fitness[0] > best_fitness:
+                    best, best_fitness = population[0], fitness[0]
+                    stale = 0
+                else:
+                    stale += 1
+                continue
+            return Run(population, fitness, best, best_fitness, done, evaluations, stopped)
+
+
+def _best(fitness, k):
+    """Indices of the k fittest, best first: a partition then a sort of those k only"""
+    if k < len(fitness):
+        top = np.argpartition(-fitness, k - 1)[:k]
+    else:
+        top = np.arange(len(fitness))
+    return top[np.argsort(-fitness[top], kind="stable")]
+
+
+#islands sending migrants to island i, out of n
+TOPOLOGIES = {
+    "ring": lambda i, n, rng: [(i - 1) % n],
+    "complete": lambda i, n, rng: [j for j in range(n) if j != i],
+    "random": lambda i, n, rng: [int(j) + (j >= i) for j in rng.choice(n - 1, size=1)],
+}
+
+def _attach(name, shape, dtype):
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _island(i, N, seed, rng_seed, blocks, population_size, offspring_size, generations, interval, migrants,
+            topology, mode, barrier):
+    """One island, in its own process; populations and migrants are read and written in shared memory"""
+    sc = SetCovering(N, seed, np.random.default_rng(rng_seed))
+    views = [_attach(*block) for block in blocks]
+    (_, populations), (_, fitnesses), (_, outbox), (_, outbox_fitness) = views
+    try:
+        population, fitness = sc.initial_population(population_size)
+        done = 0
+        while done < generations:
+            steps = min(interval, generations - done) if interval else generations
+            population, fitness = sc.evolve(population, fitness, steps, offspring_size, mode=mode)
+            done += steps
+            if done >= generations or not migrants or len(outbox) < 2:
+                continue
+            #the population is kept sorted, its best genomes are first
+            outbox[i], outbox_fitness[i] = population[:migrants], fitness[:migrants]
+            barrier.wait()
+            sources = TOPOLOGIES[topology](i, len(outbox), sc.rng)
+            arrivals = np.concatenate([outbox[j] for j in sources])
+            arrivals_fitness = np.concatenate([outbox_fitness[j] for j in sources])
+            #nobody writes its outbox again before everyone has read it
+            barrier.wait()
+            best = _best(arrivals_fitness, migrants)
+            #immigrants take the place of the worst genomes
+            population = np.vstack([population[:-migrants], arrivals[best]])
+            fitness = np.concatenate([fitness[:-migrants], arrivals_fitness[best]])
+            order = _best(fitness, len(fitness))
+            population, fitness = _frozen(population[order]), fitness[order]
+        populations[i], fitnesses[i] = population, fitness
+    except BaseException:
+        #the other islands would wait for this one at the barrier forever
+        barrier.abort()
+        raise
+    finally:
+        for block, _ in views:
+            block.close()
+
+def islands(N, seed=42, num_islands=None, population_size=None, offspring_size=10, generations=5, interval=1,
+            migrants=1, topology="ring", mode="plus", rng_seed=None):
+    """Island-model GA: num_islands populations (default: one per core) evolving in parallel processes.
+
+    Every `interval` generations each island sends copies of its `migrants`
+    best genomes to the islands that `topology` (a name in TOPOLOGIES)
+    connects it to, where they replace the worst genomes; in between, the
+    islands evolve by `mode` (see SetCovering.generation). Populations and
+    migrants go through shared memory, never through pickling. Returns the
+    final populations and fitnesses, island by island, best genomes first.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology {topology!r}, expected one of {sorted(TOPOLOGIES)}")
+    num_islands = num_islands or os.cpu_count()
+    lists = problem(N, seed)
+    population_size = population_size or len(lists)
+    migrants = min(migrants, population_size)
+    shapes = [((num_islands, population_size, len(lists)), bool), ((num_islands, population_size), np.float64),
+              ((num_islands, migrants, len(lists)), bool), ((num_islands, migrants), np.float64)]
+    shared = [shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+              for shape, dtype in shapes]
+    blocks = [(block.name, shape, dtype) for block, (shape, dtype) in zip(shared, shapes)]
+    seeds = np.random.SeedSequence(rng_seed).spawn(num_islands)
+    barrier = multiprocessing.Barrier(num_islands)
+    workers = [multiprocessing.Process(target=_island, args=(i, N, seed, seeds[i], blocks, population_size, offspring_size,
+                                                             generations, interval, migrants, topology, mode, barrier))
+               for i in range(num_islands)]
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if any(worker.exitcode for worker in workers):
+            raise RuntimeError(f"Island processes failed with exit codes {[worker.exitcode for worker in workers]}")
+        populations = np.ndarray(shapes[0][0], dtype=bool, buffer=shared[0].buf).copy()
+        fitnesses = np.ndarray(shapes[1][0], dtype=np.float64, buffer=shared[1].buf).copy()
+        return populations, fitnesses
+    finally:
+        for block in shared:
+            block.close()
+            block.unlink()
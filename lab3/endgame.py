@@ -0,0 +1,113 @@
+import argparse
+import os
+import time
+import numpy as np
+from tabular import StateSpace
+
+
+CACHE_DIR = os.environ.get("LAB3_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "lab3"))
+
+#one entry per position: does the player to move win, and the move to play (a move index of the StateSpace)
+ENTRY = np.dtype([("win", "?"), ("move", "<i2")])
+
+
+def solve(num_rows: int, k: int = None, misere: bool = False, chunk: int = 2**16) -> np.ndarray:
+    """Solves every position of Nim(num_rows) by backward induction; an ENTRY array indexed like StateSpace.
+
+    Every move lowers the number of objects, so positions are solved in
+    layers of equal total, `chunk` at a time, each looking up successors of
+    the layers already solved. The move of a winning position is the first
+    one leaving a lost position, that of a lost one its first legal move;
+    the empty position has none (-1). In misère play taking the last object
+    loses, so the player facing the empty position has won.
+    """
+    space = StateSpace(num_rows, k)
+    if int(space.moves) > np.iinfo(ENTRY["move"]).max:
+        raise ValueError(f"Nim({num_rows}) has too many moves for the table")
+    totals = np.empty(space.size, dtype=np.min_scalar_type(int(space.capacities.sum())))
+    for begin in range(0, space.size, chunk):
+        totals[begin:begin + chunk] = space.rows_of(np.arange(begin, min(begin + chunk, space.size))).sum(axis=1)
+    order = np.argsort(totals, kind="stable")
+    bounds = np.searchsorted(totals[order], np.arange(int(totals.max()) + 2))
+    del totals
+
+    table = np.empty(space.size, dtype=ENTRY)
+    win = table["win"]
+    win[0] = misere
+    table["move"][0] = -1
+    for layer in range(1, len(bounds) - 1):
+        for begin in range(bounds[layer], bounds[layer + 1], chunk):
+            states = order[begin:min(begin + chunk, bounds[layer + 1])]
+            successors = space.successors_of(states)
+            legal = successors >= 0
+            winning = legal & ~win[np.where(legal, successors, 0)]
+            win[states] = winning.any(axis=1)
+            table["move"][states] = np.where(winning.any(axis=1), winning.argmax(axis=1), legal.argmax(axis=1))
+    return table
+
+def path(num_rows: int, k: int = None, misere: bool = False, cache_dir: str = None) -> str:
+    name = f"nim-{num_rows}" + (f"-k{k}" if k is not None else "") + ("-misere" if misere else "")
+    return os.path.join(cache_dir or CACHE_DIR, name + ".npy")
+
+def build(num_rows: int, k: int = None, misere: bool = False, cache_dir: str = None) -> str:
+    """Solves a Nim and writes its table to the cache, atomically; the path of the table"""
+    target = path(num_rows, k, misere, cache_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    table = solve(num_rows, k, misere)
+    temporary = f"{target}.{os.getpid()}.npy"
+    np.save(temporary, table)
+    os.replace(temporary, target)
+    return target
+
+
+class Endgame:
+    """A solved Nim, looked up in O(1) per position.
+
+    The table is a read-only memory-mapped .npy file, so processes that load
+    the same one (the workers of a tournament, say) share its pages.
+    """
+
+    def __init__(self, space: StateSpace, table: np.ndarray, misere: bool = False):
+        self.space = space
+        self.table = table
+        self.misere = misere
+
+    def lookup(self, rows):
+        """Whether the player to move wins, and the move to play, for each position given as row counts"""
+        entries = self.table[self.space.index(rows)]
+        return entries["win"], entries["move"]
+
+    def move(self, rows):
+        """The (row, number of objects) to play in one position"""
+        move = int(self.table["move"][self.space.index(rows)])
+        return int(self.space.move_rows[move]), int(self.space.takes[move])
+
+    def strategy(self, rows, k, rng):
+        """The table as a batch strategy of simulator.py"""
+        moves = self.table["move"][self.space.index(rows)]
+        return self.space.move_rows[moves], self.space.takes[moves]
+
+def load(num_rows: int, k: int = None, misere: bool = False, cache_dir: str = None) -> Endgame:
+    """The Endgame of a Nim, solved on the first call and memory-mapped from the cache afterwards"""
+    table_path = path(num_rows, k, misere, cache_dir)
+    if not os.path.exists(table_path):
+        build(num_rows, k, misere, cache_dir)
+    return Endgame(StateSpace(num_rows, k), np.load(table_path, mmap_mode="r"), misere)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='solve every position of a Nim into a memory-mapped table')
+    parser.add_argument('num_rows', type=int, nargs='+', help='sizes of the Nims to solve')
+    parser.add_argument('-k', type=int, help='most objects taken in one move')
+    parser.add_argument('--misere', action='store_true', help='taking the last object loses')
+    parser.add_argument('--cache-dir', help=f'where tables are written (default: $LAB3_CACHE or {CACHE_DIR})')
+    args = parser.parse_args()
+
+    for num_rows in args.num_rows:
+        start = time.perf_counter()
+        table_path = build(num_rows, args.k, args.misere, args.cache_dir)
+        table = np.load(table_path, mmap_mode="r")
+        initial = "win" if table["win"][-1] else "loss"
+        print(f"Nim({num_rows}): {len(table)} positions, {table['win'].mean():.3f} won by the player to move, "
+              f"{initial} for the first player, {time.perf_counter() - start:.2f}s, "
+              f"{os.path.getsize(table_path) / 2**20:.1f} MB in {table_path}")
@@ -0,0 +1,106 @@
+import numpy as np
+
+#Many Nim games at once: positions are the rows of a games x rows array of object counts.
+#A batch strategy gets the positions of the games it moves in, the k cap and a NumPy Generator,
+#and returns for every game the row to take from and how many objects, as two arrays.
+#Strategies mirror those of lab3.ipynb, tie-breaks included, so win rates match the one-game versions.
+
+
+def initial_rows(games: int, num_rows: int) -> np.ndarray:
+    """`games` copies of Nim(num_rows): rows of 1, 3, 5... objects"""
+    return np.tile(np.arange(num_rows) * 2 + 1, (games, 1))
+
+def _limit(rows, k):
+    """Most objects that can be taken from each row"""
+    return rows if k is None else np.minimum(rows, k)
+
+def _random_row(weights, rng):
+    """For every game, a row drawn with probability proportional to its weight"""
+    cumulative = np.cumsum(weights, axis=1)
+    draw = rng.random(len(weights)) * cumulative[:, -1]
+    return (cumulative <= draw[:, None]).sum(axis=1)
+
+def _longest(rows):
+    #argmax picks the first of equal rows, as max() does
+    return rows.argmax(axis=1)
+
+def _shortest(rows):
+    return np.where(rows > 0, rows, np.iinfo(rows.dtype).max).argmin(axis=1)
+
+def pure_random(rows, k, rng):
+    """A random non-empty row, a random number of objects from it"""
+    row = _random_row(rows > 0, rng)
+    count = _limit(rows[np.arange(len(rows)), row], k)
+    return row, rng.integers(1, count + 1)
+
+def optimal_strategy(rows, k, rng):
+    """The first move (lowest row, fewest objects) leaving a nim-sum of 0, a random legal move if there is none"""
+    games = np.arange(len(rows))
+    nim_sum = np.bitwise_xor.reduce(rows, axis=1)
+    #each row has at most one such move: leave it with nim_sum ^ count objects
+    take = rows - (nim_sum[:, None] ^ rows)
+    good = (take > 0) & (take <= _limit(rows, k))
+    has = good.any(axis=1)
+    row = good.argmax(axis=1)
+    num = take[games, row]
+    #random.choice over every (row, objects) pair: rows weighted by their number of moves
+    moves = _limit(rows, k)
+    fallback = _random_row(moves, rng)
+    fallback_num = rng.integers(1, np.maximum(moves[games, fallback], 1) + 1)
+    return np.where(has, row, fallback), np.where(has, num, fallback_num)
+
+def strategy1(rows, k, rng):
+    """From the longest row, 2 objects if the total is even (and the row has more than 1), else 1"""
+    row = _longest(rows)
+    count = rows[np.arange(len(rows)), row]
+    return row, np.where((rows.sum(axis=1) % 2 == 0) & (count > 1), 2, 1)
+
+def _parity_move(rows, row):
+    """All of `row`, or all but one when an even number of rows is active and it has more than 2"""
+    count = rows[np.arange(len(rows)), row]
+    even = (rows > 0).sum(axis=1) % 2 == 0
+    return row, np.where(even & (count > 2), count - 1, count)
+
+def strategy2(rows, k, rng):
+    return _parity_move(rows, _longest(rows))
+
+def make_strategy3(p: float):
+    """The rule of strategy2 on the longest row with probability p, on the shortest non-empty row otherwise"""
+    def evolvable(rows, k, rng):
+        longest = rng.random(len(rows)) < p
+        return _parity_move(rows, np.where(longest, _longest(rows), _shortest(rows)))
+    return evolvable
+
+
+def play(first, second, games: int, num_rows: int, k: int = None, rng=None) -> np.ndarray:
+    """Plays `games` games of Nim(num_rows) between two batch strategies; the winner (0 or 1) of each.
+
+    Every game moves at each ply until it is over, so a whole batch takes as
+    many strategy calls as the longest game has plies.
+    """
+    rng = np.random.default_rng(rng)
+    #positions of the games still going on, and their indices
+    rows = initial_rows(games, num_rows)
+    active = np.arange(games)
+    winner = np.full(games, -1)
+    player = 0
+    strategies = (first, second)
+    while len(active):
+        row, num = strategies[player](rows, k, rng)
+        moving = np.arange(len(rows))
+        count = rows[moving, row]
+        if ((num < 1) | (num > count)).any() or (k is not None and (num > k).any()):
+            raise ValueError(f"Illegal move by player {player}")
+        rows[moving, row] = count - num
+        #whoever takes the last object wins
+        over = ~rows.any(axis=1)
+        winner[active[over]] = player
+        rows, active = rows[~over], active[~over]
+        player = 1 - player
+    return winner
+
+def win_rate(strategy, opponent, games: int, num_rows: int, k: int = None, first: bool = True, rng=None) -> float:
+    """Fraction of `games` won by `strategy`, playing first or second against `opponent`"""
+    if first:
+        return float((play(strategy, opponent, games, num_rows, k, rng) == 0).mean())
+    return float((play(opponent, strategy, games, num_rows, k, rng) == 1).mean())
@@ -0,0 +1,158 @@
+from functools import cached_property
+import numpy as np
+
+
+class StateSpace:
+    """Every position of Nim(num_rows) with at most `k` objects taken per move, as dense indices.
+
+    Position (r0, r1, ...) has the mixed-radix index sum(r_i * strides[i]),
+    row i having capacities[i] + 1 possible counts, so index 0 is the empty
+    position and size - 1 the initial one. Moves are numbered too: move m
+    takes takes[m] objects from row move_rows[m]. `successors[s, m]` is the
+    index reached from s by move m, -1 if the move is illegal there; the
+    table has size x moves int32 entries, known before anything is played,
+    and is only built when first used (rows_of and successors_of work on a
+    few positions at a time instead).
+    """
+
+    def __init__(self, num_rows: int, k: int = None):
+        self.num_rows = num_rows
+        self.k = k
+        self.capacities = np.arange(num_rows) * 2 + 1
+        self.strides = np.cumprod(np.concatenate([[1], self.capacities[:-1] + 1])).astype(np.int64)
+        self.size = int(np.prod(self.capacities + 1))
+        self.move_rows = np.concatenate([np.full(c if k is None else min(c, k), r)
+                                         for r, c in enumerate(self.capacities)]).astype(np.int64)
+        self.takes = np.concatenate([np.arange(1, (c if k is None else min(c, k)) + 1)
+                                     for c in self.capacities]).astype(np.int64)
+
+    @cached_property
+    def counts(self) -> np.ndarray:
+        """Row counts of every position, one column per row"""
+        return self.rows_of(np.arange(self.size))
+
+    @cached_property
+    def successors(self) -> np.ndarray:
+        return self.successors_of(np.arange(self.size)).astype(np.int32)
+
+    @property
+    def initial(self) -> int:
+        return self.size - 1
+
+    @property
+    def moves(self) -> int:
+        return len(self.takes)
+
+    def index(self, rows) -> np.ndarray:
+        """Indices of positions given as row counts, one position per row of `rows`"""
+        return np.asarray(rows, dtype=np.int64) @ self.strides
+
+    def rows_of(self, states) -> np.ndarray:
+        """Row counts of the positions of the given indices, the inverse of index"""
+        return (np.asarray(states, dtype=np.int64)[:, None] // self.strides) % (self.capacities + 1)
+
+    def successors_of(self, states) -> np.ndarray:
+        """The rows of `successors` for the given indices, as int64"""
+        states = np.asarray(states, dtype=np.int64)
+        legal = self.rows_of(states)[:, self.move_rows] >= self.takes
+        return np.where(legal, states[:, None] - self.takes * self.strides[self.move_rows], -1)
+
+    def random_legal(self, states, rng) -> np.ndarray:
+        """A uniformly random legal move in each of `states`"""
+        keys = np.where(self.successors[states] >= 0, rng.random((len(states), self.moves)), -1)
+        return keys.argmax(axis=1)
+
+
+class TabularAgent:
+    """Self-play reinforcement learning over a StateSpace, every table a NumPy array.
+
+    With method "td", values[s] is the TD(0) estimate of the outcome (1 win,
+    -1 loss) for the player to move at s, and a move is worth -values of the
+    position it leads to; s learns from its best move, whichever is played.
+    With "q", values[s, m] is the Q-learning estimate of move m at s. Either
+    way the game is zero-sum: a move is worth minus the value of the next
+    position for the opponent, and taking the last object is worth 1.
+    """
+
+    def __init__(self, space: StateSpace, alpha: float = 0.1, epsilon: float = 0.1, method: str = "td", rng=None):
+        if method not in ("td", "q"):
+            raise ValueError(f"Unknown method {method!r}, expected td or q")
+        self.space = space
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.method = method
+        self.rng = np.random.default_rng(rng)
+        self.episodes = 0
+        if method == "td":
+            self.values = np.zeros(space.size, dtype=np.float32)
+            #the player to move at the empty position has lost
+            self.values[0] = -1
+        else:
+            self.values = np.zeros((space.size, space.moves), dtype=np.float32)
+
+    def move_values(self, states) -> np.ndarray:
+        """Estimated worth of every move in each of `states`, -inf for illegal ones"""
+        successors = self.space.successors[states]
+        if self.method == "td":
+            worth = -self.values[successors]
+        else:
+            worth = self.values[states]
+        return np.where(successors >= 0, worth, -np.inf)
+
+    def act(self, states, greedy: bool = False, worth=None) -> np.ndarray:
+        """A move per state: the best one, or with probability epsilon a random one unless `greedy`"""
+        moves = (self.move_values(states) if worth is None else worth).argmax(axis=1)
+        if not greedy and self.epsilon:
+            explore = self.rng.random(len(states)) < self.epsilon
+            if explore.any():
+                moves[explore] = self.space.random_legal(states[explore], self.rng)
+        return moves
+
+    def train(self, episodes: int, games: int = 1024, start=None):
+        """Plays `episodes` games against itself, `games` of them side by side, learning after every move.
+
+        Games start from the initial position, or from `start` (an index, or
+        an array of them drawn from at random) for exploring starts.
+        """
+        space = self.space
+
+        def starts(n):
+            if start is None:
+                return np.full(n, space.initial)
+            return self.rng.choice(np.atleast_1d(start), size=n)
+
+        states = starts(min(games, episodes))
+        started = len(states)
+        while len(states):
+            worth = self.move_values(states)
+            moves = self.act(states, worth=worth)
+            following = space.successors[states, moves].astype(np.int64)
+            if self.method == "td":
+                #the best move rather than the one played, so that exploring moves do not count
+                self._update(states, worth.max(axis=1))
+            else:
+                best = self.move_values(following).max(axis=1)
+                self._update(states * space.moves + moves, np.where(following == 0, 1, -best))
+            over = following == 0
+            self.episodes += int(over.sum())
+            #finished games make room for new ones until enough have started
+            restart = min(int(over.sum()), episodes - started)
+            started += restart
+            states = np.concatenate([following[~over], starts(restart)])
+        return self
+
+    def _update(self, entries, targets):
+        """Moves the flat `entries` of the table alpha of the way towards their targets.
+
+        Games side by side often are in the same position, whose entry then
+        moves towards the mean of their targets instead of once per game.
+        """
+        table = self.values.reshape(-1)
+        entries, where = np.unique(entries, return_inverse=True)
+        errors = np.bincount(where, weights=targets - table[entries][where]) / np.bincount(where)
+        table[entries] += self.alpha * errors
+
+    def strategy(self, rows, k, rng):
+        """The greedy policy as a batch strategy of simulator.py"""
+        moves = self.act(self.space.index(rows), greedy=True)
+        return self.space.move_rows[moves], self.space.takes[moves]
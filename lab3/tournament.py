@@ -0,0 +1,121 @@
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import sys
+from collections import namedtuple
+import numpy as np
+import endgame
+import simulator
+
+
+#strategies are named, so that worker processes can rebuild them; "strategy3:0.3" is make_strategy3(0.3),
+#"endgame" the solved table of the Nim played, memory-mapped by every worker
+STRATEGIES = {
+    "pure_random": simulator.pure_random,
+    "optimal_strategy": simulator.optimal_strategy,
+    "strategy1": simulator.strategy1,
+    "strategy2": simulator.strategy2,
+}
+
+def resolve(name: str, num_rows: int = None, k: int = None):
+    if name == "endgame":
+        return endgame.load(num_rows, k).strategy
+    if name.startswith("strategy3:"):
+        return simulator.make_strategy3(float(name.split(":", 1)[1]))
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {name!r}, expected one of {sorted(STRATEGIES)} or strategy3:<p> or endgame")
+    return STRATEGIES[name]
+
+
+Result = namedtuple("Result", ["first", "second", "games", "wins", "rate", "low", "high", "winner"])
+
+def wilson(wins: int, games: int, z: float = 3.0):
+    """Wilson score interval of a win rate, z = 3 being 99.7%"""
+    if not games:
+        return 0.0, 1.0
+    p = wins / games
+    center = (p + z * z / (2 * games)) / (1 + z * z / games)
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return center - half, center + half
+
+def sprt(wins: int, games: int, delta: float = 0.05, alpha: float = 0.05, beta: float = 0.05):
+    """Sequential probability ratio test of rate 0.5 + delta against 0.5 - delta: 1, -1, or 0 to keep playing"""
+    p0, p1 = 0.5 - delta, 0.5 + delta
+    llr = wins * math.log(p1 / p0) + (games - wins) * math.log((1 - p1) / (1 - p0))
+    if llr >= math.log((1 - beta) / alpha):
+        return 1
+    if llr <= math.log(beta / (1 - alpha)):
+        return -1
+    return 0
+
+def pairing(first: str, second: str, num_rows: int, k: int = None, seed=None, test: str = "wilson",
+            batch: int = 64, max_games: int = 10_000) -> Result:
+    """Plays `first` against `second` in batches until `test` ("wilson" or "sprt") tells which one is better.
+
+    With "wilson" the pairing is decided once the interval of the win rate of
+    `first` excludes 0.5; it is a 99.7% one because it is looked at after
+    every batch, which a 95% one could not afford. "sprt" assumes that one
+    strategy wins at least 55% of the games and then needs fewer of them.
+    `winner` is None if `max_games` are played first.
+    """
+    if test not in ("wilson", "sprt"):
+        raise ValueError(f"Unknown test {test!r}, expected wilson or sprt")
+    rng = np.random.default_rng(seed)
+    a, b = resolve(first, num_rows, k), resolve(second, num_rows, k)
+    games = wins = 0
+    decision = 0
+    while games < max_games and not decision:
+        n = min(batch, max_games - games)
+        wins += int((simulator.play(a, b, n, num_rows, k, rng) == 0).sum())
+        games += n
+        if test == "sprt":
+            decision = sprt(wins, games)
+        else:
+            low, high = wilson(wins, games)
+            decision = 1 if low > 0.5 else -1 if high < 0.5 else 0
+    low, high = wilson(wins, games)
+    winner = first if decision > 0 else second if decision < 0 else None
+    return Result(first, second, games, wins, wins / games, low, high, winner)
+
+def _pairing(job) -> Result:
+    return pairing(*job)
+
+def run(strategies, num_rows: int, k: int = None, seed=None, test: str = "wilson", batch: int = 64,
+        max_games: int = 10_000, processes: int = None):
+    """Every ordered pair of `strategies` (so both seat orders), spread over a process pool.
+
+    Each pairing draws from its own stream spawned from `seed`; results are
+    yielded as soon as they are ready.
+    """
+    #also solves the Nim once, before the workers map its table
+    for name in strategies:
+        resolve(name, num_rows, k)
+    pairs = list(itertools.permutations(strategies, 2))
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs))
+    jobs = [(first, second, num_rows, k, s, test, batch, max_games) for (first, second), s in zip(pairs, seeds)]
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(_pairing, jobs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='play every pair of Nim strategies until the better one is known')
+    parser.add_argument('strategies', nargs='+', help=f'among {", ".join(sorted(STRATEGIES))}, strategy3:<p> and endgame')
+    parser.add_argument('-n', '--num-rows', type=int, default=10)
+    parser.add_argument('-k', type=int, help='most objects taken in one move')
+    parser.add_argument('--test', choices=['wilson', 'sprt'], default='wilson')
+    parser.add_argument('-b', '--batch', type=int, default=64, help='games played between two tests')
+    parser.add_argument('-m', '--max-games', type=int, default=10_000, help='games after which a pairing is a draw')
+    parser.add_argument('-s', '--seed', type=int)
+    parser.add_argument('-p', '--processes', type=int, help='worker processes (default: one per core)')
+    parser.add_argument('--json', action='store_true', help='one JSON line per pairing')
+    args = parser.parse_args()
+
+    for result in run(args.strategies, args.num_rows, args.k, args.seed, args.test, args.batch, args.max_games,
+                      args.processes):
+        if args.json:
+            sys.stdout.write(json.dumps(result._asdict()) + "\n")
+        else:
+            print(f"{result.first} vs. {result.second}: {result.rate:.3f} [{result.low:.3f}, {result.high:.3f}] "
+                  f"after {result.games} games, {result.winner or 'undecided'}")